@@ -0,0 +1 @@
+# Performance benchmarks for space_mutators, see benchmarks/run.py and benchmarks/compare.py
@@ -0,0 +1,32 @@
+# bench_coordinator.py
+
+# EnemyCoordinatorNetwork cost: a bare forward pass and compute_actions with
+# a full set of enemies (the per-frame call game_loop makes).
+
+import numpy as np
+from space_mutators.enemy_ai import EnemyCoordinatorNetwork
+from .common import best_time, latency_us
+
+NUM_ENEMIES = 10
+SEED = 0
+
+def run(quick=False):
+    calls = 2_000 if quick else 20_000
+    rng = np.random.default_rng(SEED)
+    net = EnemyCoordinatorNetwork(NUM_ENEMIES, 2 + 2 * NUM_ENEMIES, hidden_size=8, rng=rng)
+    features = rng.random(net.input_size) * 600
+    player_pos = (300, 560)
+    enemy_positions = [tuple(p) for p in (rng.random((NUM_ENEMIES, 2)) * 600).tolist()]
+
+    def forward():
+        for _ in range(calls):
+            net.forward(features)
+
+    def compute_actions():
+        for _ in range(calls):
+            net.compute_actions(player_pos, enemy_positions)
+
+    return {
+        "coordinator/forward": latency_us(calls, best_time(forward)),
+        "coordinator/compute_actions": latency_us(calls, best_time(compute_actions)),
+    }
@@ -0,0 +1,42 @@
+# bench_dqn.py
+
+# DQNAgent.train_step updates per second across batch sizes, on a replay
+# buffer pre-filled with random vector transitions.
+
+import numpy as np
+import torch
+from space_mutators.dqn_agent import DQNAgent
+from space_mutators.space_mutators_env import ACTIONS
+from .common import best_time, rate
+
+BATCH_SIZES = (32, 64, 128, 256)
+STATE_DIM = 7
+SEED = 0
+
+def _agent(batch_size, buffer_size=10_000):
+    torch.manual_seed(SEED)
+    agent = DQNAgent(STATE_DIM, len(ACTIONS), batch_size=batch_size, buffer_size=buffer_size)
+    rng = np.random.default_rng(SEED)
+    agent.replay_buffer.rng = np.random.default_rng(SEED)
+    n = buffer_size
+    states = rng.random((n, STATE_DIM), dtype=np.float32)
+    next_states = rng.random((n, STATE_DIM), dtype=np.float32)
+    agent.replay_buffer.push_many(states, rng.integers(0, len(ACTIONS), size=n),
+                                  rng.random(n, dtype=np.float32), next_states, rng.random(n) < 0.01)
+    return agent
+
+def run(quick=False):
+    updates = 50 if quick else 500
+    results = {}
+    for batch_size in BATCH_SIZES:
+        agent = _agent(batch_size)
+        # Warm up allocator/threads before timing
+        for _ in range(10):
+            agent.train_step()
+
+        def train():
+            for _ in range(updates):
+                agent.train_step()
+
+        results[f"dqn_train_step/batch{batch_size}"] = rate(updates, best_time(train), "updates/sec")
+    return results
@@ -0,0 +1,51 @@
+# bench_env.py
+
+# SpaceMutatorsEnv.step throughput at different enemy/bullet densities.
+# Density is set with the spawn interval (enemies) and how often the policy
+# shoots (bullets); actions are pre-drawn from a fixed seed so every run
+# steps the same games.
+
+import numpy as np
+from space_mutators.space_mutators_env import SpaceMutatorsEnv
+from .common import best_time, rate
+
+# name: (spawn_interval, shoot probability, obs_mode)
+CASES = {
+    "sparse": (80, 0.1, "vector"),
+    "medium": (20, 0.5, "vector"),
+    "dense": (5, 1.0, "vector"),
+    "dense_entities": (5, 1.0, "entities"),
+}
+
+SEED = 0
+
+def _actions(count, shoot_prob):
+    rng = np.random.default_rng(SEED)
+    moves = rng.integers(0, 3, size=count)
+    return np.where(rng.random(count) < shoot_prob, 3, moves).tolist()
+
+def _run_case(spawn_interval, shoot_prob, obs_mode, steps):
+    actions = _actions(steps, shoot_prob)
+    counts = {"enemies": 0, "bullets": 0}
+
+    def play():
+        env = SpaceMutatorsEnv(obs_mode=obs_mode, seed=SEED)
+        env.sim.spawn_interval = spawn_interval
+        sim = env.sim
+        enemies = bullets = 0
+        for action in actions:
+            _, _, done, _ = env.step(action)
+            enemies += len(sim.enemies)
+            bullets += len(sim.bullets)
+            if done:
+                env.reset()
+        counts["enemies"] = enemies / steps
+        counts["bullets"] = bullets / steps
+
+    seconds = best_time(play)
+    return rate(steps, seconds, "steps/sec") | {
+        "mean_enemies": counts["enemies"], "mean_bullets": counts["bullets"]}
+
+def run(quick=False):
+    steps = 2_000 if quick else 20_000
+    return {f"env_step/{name}": _run_case(*case, steps) for name, case in CASES.items()}
@@ -0,0 +1,54 @@
+# bench_game_loop.py
+
+# Frame time of the interactive game_loop, run headless: dummy SDL video
+# driver, no player input, and a clock that never waits. With the random
+# streams seeded, every run plays the same game to its end.
+
+import os
+import io
+import time
+import random
+import contextlib
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from space_mutators.settings import TOTAL_WIDTH, SCREEN_HEIGHT
+from space_mutators import game_loop as game_loop_module
+from .common import result
+
+SEED = 1
+
+class _CountingClock:
+    # Stands in for pygame.time.Clock: counts frames, never sleeps
+    def __init__(self):
+        self.frames = 0
+
+    def tick(self, fps=0):
+        self.frames += 1
+        return 0
+
+def _play(screen, font):
+    random.seed(SEED)
+    np.random.seed(SEED)
+    clock = _CountingClock()
+    start = time.perf_counter()
+    # game_loop prints fitness/draw stats at the end of the game
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_loop_module.game_loop(screen, clock, font, None)
+    return time.perf_counter() - start, clock.frames
+
+def run(quick=False):
+    pygame.init()
+    screen = pygame.display.set_mode((TOTAL_WIDTH, SCREEN_HEIGHT))
+    font = pygame.font.SysFont("Arial", 24, bold=True)
+    best = None
+    for _ in range(1 if quick else 3):
+        seconds, frames = _play(screen, font)
+        if best is None or seconds / frames < best[0] / best[1]:
+            best = (seconds, frames)
+    seconds, frames = best
+    pygame.quit()
+    return {"game_loop/frame": result(seconds / frames * 1000, "ms", False, count=frames)}
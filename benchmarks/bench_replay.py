@@ -0,0 +1,70 @@
+# bench_replay.py
+
+# ReplayBuffer.sample latency (uniform and prioritized) on a full buffer,
+# gathering into preallocated arrays like DQNAgent's fast path does, plus
+# FrameReplayBuffer rebuilding 64x64 frame stacks.
+
+import numpy as np
+from space_mutators.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, FrameReplayBuffer
+from .common import best_time, latency_us
+
+BATCH_SIZES = (32, 64, 256)
+CAPACITY = 100_000
+STATE_DIM = 7
+SEED = 0
+
+def _fill(buffer):
+    rng = np.random.default_rng(SEED)
+    buffer.rng = np.random.default_rng(SEED)
+    n = buffer.capacity
+    buffer.push_many(rng.random((n, STATE_DIM), dtype=np.float32), rng.integers(0, 4, size=n),
+                     rng.random(n, dtype=np.float32), rng.random((n, STATE_DIM), dtype=np.float32),
+                     rng.random(n) < 0.01)
+    return buffer
+
+def _out(batch_size):
+    return (np.empty((batch_size, STATE_DIM), dtype=np.float32), np.empty(batch_size, dtype=np.int64),
+            np.empty(batch_size, dtype=np.float32), np.empty((batch_size, STATE_DIM), dtype=np.float32),
+            np.empty(batch_size, dtype=bool))
+
+def _fill_frames(capacity, frame_stack=4, size=64):
+    # Env-like episodes of 1-7 steps of random frames, pushed until the rings
+    # have wrapped (episode starts cost extra frames, so it's never quite full)
+    rng = np.random.default_rng(SEED)
+    buffer = FrameReplayBuffer(capacity, frame_stack)
+    buffer.rng = np.random.default_rng(SEED)
+    while buffer.frame_count < 2 * buffer.frame_capacity:
+        stack = np.repeat(rng.integers(0, 256, size=(1, size, size), dtype=np.uint8), frame_stack, axis=0)
+        steps = rng.integers(1, 8)
+        for step in range(steps):
+            frame = rng.integers(0, 256, size=(1, size, size), dtype=np.uint8)
+            next_stack = np.concatenate([stack[1:], frame])
+            buffer.push(stack, 0, 0.0, next_stack, step == steps - 1)
+            stack = next_stack
+    return buffer
+
+def run(quick=False):
+    samples = 200 if quick else 2_000
+    buffers = {
+        "uniform": _fill(ReplayBuffer(CAPACITY)),
+        "prioritized": _fill(PrioritizedReplayBuffer(CAPACITY)),
+    }
+    results = {}
+    for name, buffer in buffers.items():
+        for batch_size in BATCH_SIZES:
+            out = _out(batch_size)
+
+            def sample():
+                for _ in range(samples):
+                    buffer.sample(batch_size, out=out)
+
+            results[f"replay_sample/{name}/batch{batch_size}"] = latency_us(samples, best_time(sample))
+
+    buffer = _fill_frames(10_000)
+    for batch_size in BATCH_SIZES:
+        def sample():
+            for _ in range(samples):
+                buffer.sample(batch_size)
+
+        results[f"replay_sample/frames/batch{batch_size}"] = latency_us(samples, best_time(sample))
+    return results
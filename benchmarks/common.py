@@ -0,0 +1,27 @@
+# common.py
+
+# Timing helpers and the result format shared by all benchmarks.
+# A benchmark module exposes run(quick) returning {case name: result}.
+
+import time
+
+def best_time(fn, repeat=3):
+    # Fastest of `repeat` calls of fn() in seconds: the run least disturbed
+    # by other load on the machine is the closest to the real cost
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def result(value, unit, higher_is_better, **extra):
+    # One measurement as stored in the JSON file; extra keys are context
+    # (workload size, entity counts...) and are not compared
+    return dict(value=float(value), unit=unit, higher_is_better=higher_is_better, **extra)
+
+def rate(count, seconds, unit):
+    return result(count / seconds, unit, True, count=count)
+
+def latency_us(count, seconds):
+    return result(seconds / count * 1e6, "us", False, count=count)
@@ -0,0 +1,79 @@
+# compare.py
+
+# Compares a benchmark run against a stored baseline and flags regressions.
+#
+#   python -m benchmarks.compare baseline.json benchmark_results.json [--threshold 0.1]
+#
+# A case regresses when it is more than `threshold` (relative) worse than the
+# baseline: lower for rates, higher for latencies. Exits with 1 if any case
+# regressed, so it can gate a change.
+
+import sys
+import json
+import argparse
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare(baseline, current, threshold=0.1):
+    # Returns rows of (case, baseline value, current value, relative change, status);
+    # change > 0 is always an improvement
+    rows = []
+    base_results = baseline["results"]
+    new_results = current["results"]
+    for case in sorted(set(base_results) | set(new_results)):
+        if case not in new_results:
+            rows.append((case, base_results[case]["value"], None, None, "missing"))
+            continue
+        if case not in base_results:
+            rows.append((case, None, new_results[case]["value"], None, "new"))
+            continue
+        base, new = base_results[case], new_results[case]
+        if base["value"] == 0:
+            change = 0.0
+        elif base["higher_is_better"]:
+            change = new["value"] / base["value"] - 1
+        else:
+            change = base["value"] / new["value"] - 1 if new["value"] else float("inf")
+        if change < -threshold:
+            status = "REGRESSION"
+        elif change > threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((case, base["value"], new["value"], change, status))
+    return rows
+
+def _fmt(value):
+    return "-" if value is None else f"{value:.2f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown tolerated before a case counts as regressed")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get("environment") != current.get("environment"):
+        print("Warning: results come from different environments, timings may not be comparable")
+    if baseline.get("quick") != current.get("quick"):
+        print("Warning: comparing a --quick run with a full run")
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'case':40s} {'baseline':>12s} {'current':>12s} {'change':>8s}  status")
+    for case, base, new, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1%}"
+        print(f"{case:40s} {_fmt(base):>12s} {_fmt(new):>12s} {change_text:>8s}  {status}")
+
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
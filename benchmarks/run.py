@@ -0,0 +1,81 @@
+# run.py
+
+# Runs the benchmark suite and writes the results as JSON.
+#
+#   python -m benchmarks.run                      # everything -> benchmark_results.json
+#   python -m benchmarks.run --only env,replay    # some suites
+#   python -m benchmarks.run --quick -o quick.json
+#
+# Compare two result files with benchmarks/compare.py.
+
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib
+
+# Suite name -> module, imported only when the suite runs
+SUITES = {
+    "env": "benchmarks.bench_env",
+    "dqn": "benchmarks.bench_dqn",
+    "replay": "benchmarks.bench_replay",
+    "coordinator": "benchmarks.bench_coordinator",
+    "game_loop": "benchmarks.bench_game_loop",
+}
+
+def environment():
+    # Enough context to tell whether two result files are comparable
+    import numpy as np
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+def run_suites(names, quick=False):
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        suite = importlib.import_module(SUITES[name])
+        suite_results = suite.run(quick=quick)
+        results.update(suite_results)
+        print(f"{name}: {len(suite_results)} cases in {time.perf_counter() - start:.1f}s")
+        for case, res in suite_results.items():
+            print(f"  {case:40s} {res['value']:12.2f} {res['unit']}")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the space_mutators benchmarks")
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--only", help="comma separated suites: " + ",".join(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, for smoke runs")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(SUITES)
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites {unknown}, choose from {list(SUITES)}")
+
+    results = run_suites(names, quick=args.quick)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": args.quick,
+        "environment": environment(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Saved {len(results)} results to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# actor_pool.py
+
+import random
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from .space_mutators_env import SpaceMutatorsEnv
+
+# EnvPool runs one SpaceMutatorsEnv per worker process.
+# Actions, observations, rewards and dones are exchanged through
+# multiprocessing.shared_memory arrays; the pipes only carry tiny
+# command bytes, so no observation is ever pickled.
+#
+# It has the same interface as SpaceMutatorsVecEnv:
+#   obs = pool.reset()
+#   obs, rewards, dones, infos = pool.step(actions)
+# Finished games are reset by their worker, the last observation before the
+# reset is in infos["terminal_observation"]. The returned arrays are views of
+# shared memory and are overwritten by the next step, copy what you keep.
+
+_STEP = b"s"
+_RESET = b"r"
+_CLOSE = b"c"
+_OK = b"k"
+
+
+def shared_array(shape, dtype, name=None):
+    dtype = np.dtype(dtype)
+    nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+    if name is None:
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _array_specs(num_envs, obs_dim):
+    # (shape, dtype) of actions, obs, rewards, dones, terminal_obs
+    return [
+        ((num_envs,), np.int64),
+        ((num_envs, obs_dim), np.float32),
+        ((num_envs,), np.float32),
+        ((num_envs,), np.bool_),
+        ((num_envs, obs_dim), np.float32),
+    ]
+
+
+def worker_seed(seed, index):
+    # Env seed of worker `index`: seed + index, or fresh OS entropy for an
+    # unseeded run. Every worker env gets its own stream, forked workers
+    # would otherwise all continue the parent's global one and play identical games
+    if seed is None:
+        return random.SystemRandom().randrange(2**31)
+    return seed + index
+
+
+def _env_worker(index, conn, names, num_envs, obs_dim, seed, action_repeat):
+    env_seed = worker_seed(seed, index)
+
+    shms, arrays = [], []
+    for name, (shape, dtype) in zip(names, _array_specs(num_envs, obs_dim)):
+        shm, array = shared_array(shape, dtype, name=name)
+        shms.append(shm)
+        arrays.append(array)
+    actions, obs, rewards, dones, terminal_obs = arrays
+
+    env = SpaceMutatorsEnv(render=False, action_repeat=action_repeat, seed=env_seed)
+    try:
+        while True:
+            command = conn.recv_bytes()
+            if command == _STEP:
+                next_obs, reward, done, _ = env.step(int(actions[index]))
+                if done:
+                    terminal_obs[index] = next_obs
+                    next_obs = env.reset()
+                obs[index] = next_obs
+                rewards[index] = reward
+                dones[index] = done
+            elif command == _RESET:
+                obs[index] = env.reset()
+                dones[index] = False
+            elif command == _CLOSE:
+                break
+            conn.send_bytes(_OK)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        env.close()
+        del actions, obs, rewards, dones, terminal_obs, arrays
+        for shm in shms:
+            shm.close()
+
+
+class EnvPool:
+    def __init__(self, num_workers=4, seed=None, action_repeat=1):
+        self.num_envs = num_workers
+        self.observation_dim = SpaceMutatorsEnv(render=False).reset().shape[0]
+
+        self._shms = []
+        arrays = []
+        for shape, dtype in _array_specs(self.num_envs, self.observation_dim):
+            shm, array = shared_array(shape, dtype)
+            self._shms.append(shm)
+            arrays.append(array)
+        self.actions, self.obs, self.rewards, self.dones, self.terminal_obs = arrays
+        names = [shm.name for shm in self._shms]
+
+        self._conns = []
+        self._procs = []
+        for index in range(self.num_envs):
+            parent_conn, child_conn = mp.Pipe()
+            proc = mp.Process(target=_env_worker,
+                              args=(index, child_conn, names, self.num_envs, self.observation_dim, seed,
+                                    action_repeat),
+                              daemon=True)
+            proc.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._procs.append(proc)
+        self.closed = False
+
+    def _broadcast(self, command, indices=None):
+        # Send to every worker first, then wait, so they all work in parallel
+        conns = self._conns if indices is None else [self._conns[i] for i in indices]
+        for conn in conns:
+            conn.send_bytes(command)
+        for conn in conns:
+            conn.recv_bytes()
+
+    def reset(self):
+        self._broadcast(_RESET)
+        return self.obs
+
+    def reset_envs(self, mask):
+        # Restart only some games (e.g. when they hit a step limit)
+        self._broadcast(_RESET, np.flatnonzero(mask))
+        return self.obs
+
+    def step(self, actions):
+        self.actions[:] = actions
+        self._broadcast(_STEP)
+        infos = {}
+        if self.dones.any():
+            infos["terminal_observation"] = self.terminal_obs
+        return self.obs, self.rewards, self.dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._conns:
+            try:
+                conn.send_bytes(_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        del self.actions, self.obs, self.rewards, self.dones, self.terminal_obs
+        for shm in self._shms:
+            try:
+                shm.close()
+            except BufferError:
+                # A caller still holds a view of it, the mapping goes away with that view
+                pass
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
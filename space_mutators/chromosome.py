@@ -0,0 +1,310 @@
+# chromosome.py
+
+import random
+import numpy as np
+
+class EnemyChromosome:
+
+    # A container for enemy 'genes' plus logic for mutation, crossover, fitness, etc.
+
+    def __init__(
+        self,
+        speed_gene=None,
+        health_gene=None,
+        bullet_speed_gene=None,
+        sprite_scale_gene=None,
+        color_tint_gene=None,
+        rng=None
+    ):
+
+        # rng: a random.Random stream for reproducible runs, default is the global one
+        if rng is None:
+            rng = random
+        self.speed_gene = speed_gene if speed_gene is not None else rng.randint(1, 2)
+        self.health_gene = health_gene if health_gene is not None else rng.randint(1, 3)
+        self.bullet_speed_gene = bullet_speed_gene if bullet_speed_gene is not None else rng.randint(5, 12)
+        self.sprite_scale_gene = sprite_scale_gene if sprite_scale_gene is not None else rng.randint(80, 150)
+        self.color_tint_gene = color_tint_gene if color_tint_gene is not None else rng.randint(0, 255)
+
+        # Track how "successful" or "fit" the enemy was
+        self.fitness = 0
+
+        # ChromosomeStats this chromosome is registered with (kept up to date
+        # by mutate/add_fitness), None when not tracked
+        self.stats = None
+
+    def mutate(self, mutation_rate=0.1, rng=None):
+        if rng is None:
+            rng = random
+        if self.stats is not None:
+            old_genes = [getattr(self, gene) for gene in GENES]
+
+        if rng.random() < mutation_rate:
+            self.speed_gene = max(1, self.speed_gene + rng.choice([-1, 1]))
+        if rng.random() < mutation_rate:
+            self.health_gene = max(1, self.health_gene + rng.choice([-1, 1]))
+        if rng.random() < mutation_rate:
+            self.bullet_speed_gene = max(1, self.bullet_speed_gene + rng.choice([-2, -1, 1, 2]))
+        if rng.random() < mutation_rate:
+            #sprite_scale_gene in [10..200] to avoid extremes
+            self.sprite_scale_gene = max(150, min(80, self.sprite_scale_gene + rng.choice([-10, -5, 5, 10])))
+        if rng.random() < mutation_rate:
+            # color_tint_gene in [0..255]
+            shift = rng.randint(-30, 30)
+            self.color_tint_gene = min(255, max(0, self.color_tint_gene + shift))
+
+        if self.stats is not None:
+            self.stats.genes_changed(self, old_genes)
+
+    @staticmethod
+    def crossover(parentA, parentB, rng=None):
+        if rng is None:
+            rng = random
+
+        child = EnemyChromosome(
+            speed_gene = parentA.speed_gene if rng.random() < 0.5 else parentB.speed_gene,
+            health_gene = parentA.health_gene if rng.random() < 0.5 else parentB.health_gene,
+            bullet_speed_gene = parentA.bullet_speed_gene if rng.random() < 0.5 else parentB.bullet_speed_gene,
+            sprite_scale_gene = parentA.sprite_scale_gene if rng.random() < 0.5 else parentB.sprite_scale_gene,
+            color_tint_gene = parentA.color_tint_gene if rng.random() < 0.5 else parentB.color_tint_gene
+        )
+        return child
+
+    def add_fitness(self, amount):
+
+        old_fitness = self.fitness
+        self.fitness += amount
+        if self.stats is not None:
+            self.stats.fitness_changed(old_fitness, self.fitness)
+
+    def __repr__(self):
+        return (f"<EnemyChromosome speed={self.speed_gene} "
+                f"health={self.health_gene} bullet_speed={self.bullet_speed_gene} "
+                f"scale={self.sprite_scale_gene} color={self.color_tint_gene} "
+                f"fitness={self.fitness}>")
+
+
+GENES = ("speed_gene", "health_gene", "bullet_speed_gene", "sprite_scale_gene", "color_tint_gene")
+
+# Same ranges as a fresh EnemyChromosome (high end exclusive)
+GENE_INIT_RANGES = {
+    "speed_gene": (1, 3),
+    "health_gene": (1, 4),
+    "bullet_speed_gene": (5, 13),
+    "sprite_scale_gene": (80, 151),
+    "color_tint_gene": (0, 256),
+}
+
+# Mutation steps and clamping per gene. The steps are those of
+# EnemyChromosome.mutate, the clamping is what it means to do: its
+# sprite_scale clamp max(150, min(80, ...)) always yields 150, while here a
+# mutated sprite_scale_gene stays within [80, 150].
+GENE_STEPS = {
+    "speed_gene": [-1, 1],
+    "health_gene": [-1, 1],
+    "bullet_speed_gene": [-2, -1, 1, 2],
+    "sprite_scale_gene": [-10, -5, 5, 10],
+    "color_tint_gene": list(range(-30, 31)),
+}
+GENE_BOUNDS = {
+    "speed_gene": (1, None),
+    "health_gene": (1, None),
+    "bullet_speed_gene": (1, None),
+    "sprite_scale_gene": (80, 150),
+    "color_tint_gene": (0, 255),
+}
+
+
+class ChromosomeView:
+
+    # Lightweight stand-in for EnemyChromosome backed by one row of a
+    # ChromosomePopulation, so it can be passed to Enemy(level, chromosome=...)
+    # or registered with a ChromosomeStats. The registration belongs to the
+    # row (population.row_stats), so every view of it and the population's
+    # batch updates (mutate, add_fitness) keep the stats up to date.
+
+    __slots__ = ("population", "index")
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+
+    @property
+    def stats(self):
+        return self.population.row_stats.get(self.index)
+
+    @stats.setter
+    def stats(self, stats):
+        if stats is None:
+            self.population.row_stats.pop(self.index, None)
+        else:
+            self.population.row_stats[self.index] = stats
+
+    def _get(self, gene):
+        return int(self.population.genes[gene][self.index])
+
+    def _set(self, gene, value):
+        self.population.genes[gene][self.index] = value
+
+    speed_gene = property(lambda self: self._get("speed_gene"),
+                          lambda self, value: self._set("speed_gene", value))
+    health_gene = property(lambda self: self._get("health_gene"),
+                           lambda self, value: self._set("health_gene", value))
+    bullet_speed_gene = property(lambda self: self._get("bullet_speed_gene"),
+                                 lambda self, value: self._set("bullet_speed_gene", value))
+    sprite_scale_gene = property(lambda self: self._get("sprite_scale_gene"),
+                                 lambda self, value: self._set("sprite_scale_gene", value))
+    color_tint_gene = property(lambda self: self._get("color_tint_gene"),
+                               lambda self, value: self._set("color_tint_gene", value))
+
+    @property
+    def fitness(self):
+        return float(self.population.fitness[self.index])
+
+    @fitness.setter
+    def fitness(self, value):
+        self.population.fitness[self.index] = value
+
+    def add_fitness(self, amount):
+        old_fitness = self.fitness
+        self.population.fitness[self.index] += amount
+        if self.stats is not None:
+            self.stats.fitness_changed(old_fitness, self.fitness)
+
+    def mutate(self, mutation_rate=0.1, rng=None):
+        # Population rows draw from the population's own stream, rng is ignored.
+        # population.mutate tells the stats
+        self.population.mutate([self.index], mutation_rate)
+
+    def __repr__(self):
+        return (f"<ChromosomeView #{self.index} speed={self.speed_gene} "
+                f"health={self.health_gene} bullet_speed={self.bullet_speed_gene} "
+                f"scale={self.sprite_scale_gene} color={self.color_tint_gene} "
+                f"fitness={self.fitness}>")
+
+
+class ChromosomePopulation:
+
+    # All genes and fitness of many chromosomes as NumPy columns (struct of arrays).
+    # Individuals are row indices; crossover, mutation and fitness updates work on
+    # whole index arrays at once. view(i) hands out an EnemyChromosome-like object.
+
+    def __init__(self, capacity=1024, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.size = 0
+        self.genes = {gene: np.zeros(capacity, dtype=np.int64) for gene in GENES}
+        self.fitness = np.zeros(capacity, dtype=np.float64)
+        # Row index -> ChromosomeStats the row is registered with (see ChromosomeView)
+        self.row_stats = {}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.fitness)
+
+    def _allocate(self, n):
+        # Returns the indices of n new rows, doubling the columns when full
+        start, end = self.size, self.size + n
+        if end > self.capacity:
+            new_capacity = max(end, 2 * self.capacity)
+            for gene in GENES:
+                column = np.zeros(new_capacity, dtype=np.int64)
+                column[:start] = self.genes[gene][:start]
+                self.genes[gene] = column
+            fitness = np.zeros(new_capacity, dtype=np.float64)
+            fitness[:start] = self.fitness[:start]
+            self.fitness = fitness
+        self.size = end
+        return np.arange(start, end)
+
+    def add_random(self, n):
+        # n fresh individuals, like n calls to EnemyChromosome()
+        idx = self._allocate(n)
+        for gene in GENES:
+            low, high = GENE_INIT_RANGES[gene]
+            self.genes[gene][idx] = self.rng.integers(low, high, size=n)
+        self.fitness[idx] = 0.0
+        return idx
+
+    def add(self, chromosomes):
+        # Copy existing EnemyChromosome (or view) objects in
+        idx = self._allocate(len(chromosomes))
+        for gene in GENES:
+            self.genes[gene][idx] = [getattr(c, gene) for c in chromosomes]
+        self.fitness[idx] = [c.fitness for c in chromosomes]
+        return idx
+
+    def view(self, index):
+        return ChromosomeView(self, int(index))
+
+    def views(self, indices):
+        return [ChromosomeView(self, int(i)) for i in indices]
+
+    def crossover(self, parents_a, parents_b):
+        # One child per (a, b) pair, each gene taken from either parent with p=0.5
+        parents_a = np.asarray(parents_a)
+        parents_b = np.asarray(parents_b)
+        n = len(parents_a)
+        idx = self._allocate(n)
+        take_a = self.rng.random((len(GENES), n)) < 0.5
+        for row, gene in enumerate(GENES):
+            column = self.genes[gene]
+            column[idx] = np.where(take_a[row], column[parents_a], column[parents_b])
+        self.fitness[idx] = 0.0
+        return idx
+
+    def _registered(self, indices):
+        # The distinct rows among indices that are registered with a ChromosomeStats
+        if not self.row_stats:
+            return []
+        return [i for i in np.unique(indices).tolist() if i in self.row_stats]
+
+    def mutate(self, indices, mutation_rate=0.1):
+        # Each gene of each individual moves by a random step with p=mutation_rate,
+        # then gets clamped into its range
+        indices = np.asarray(indices)
+        n = len(indices)
+        registered = self._registered(indices)
+        old_genes = [[int(self.genes[gene][i]) for gene in GENES] for i in registered]
+        for gene in GENES:
+            hit = indices[self.rng.random(n) < mutation_rate]
+            if len(hit) == 0:
+                continue
+            column = self.genes[gene]
+            low, high = GENE_BOUNDS[gene]
+            column[hit] = np.clip(column[hit] + self.rng.choice(GENE_STEPS[gene], size=len(hit)), low, high)
+        for i, old in zip(registered, old_genes):
+            self.row_stats[i].genes_changed(self.view(i), old)
+
+    def breed(self, n, parents=None, mutation_rate=0.15):
+        # n children from parents drawn uniformly (with replacement) from `parents`
+        # (default: everybody), the vectorized version of game_loop's spawn breeding
+        pool = np.arange(self.size) if parents is None else np.asarray(parents)
+        parents_a = pool[self.rng.integers(0, len(pool), size=n)]
+        parents_b = pool[self.rng.integers(0, len(pool), size=n)]
+        children = self.crossover(parents_a, parents_b)
+        self.mutate(children, mutation_rate)
+        return children
+
+    def add_fitness(self, indices, amounts):
+        # Repeated indices accumulate
+        indices = np.asarray(indices)
+        registered = self._registered(indices)
+        old_fitness = self.fitness[registered].tolist()
+        np.add.at(self.fitness, indices, amounts)
+        for i, old in zip(registered, old_fitness):
+            self.row_stats[i].fitness_changed(old, float(self.fitness[i]))
+
+    def best(self, n):
+        # Indices of the n fittest individuals, fittest first
+        fitness = self.fitness[:self.size]
+        n = min(n, self.size)
+        if n <= 0:
+            return np.zeros(0, dtype=np.intp)
+        top = np.argpartition(fitness, -n)[-n:]
+        return top[np.argsort(fitness[top])[::-1]]
+
+    def mean_genes(self):
+        return {gene: float(self.genes[gene][:self.size].mean()) for gene in GENES}
@@ -0,0 +1,120 @@
+# chromosome_stats.py
+
+# Running statistics over a changing set of chromosomes.
+# Chromosomes are registered once (add) and report their own changes
+# (EnemyChromosome.mutate/add_fitness, ChromosomeView and the batch updates
+# of ChromosomePopulation call back into ChromosomeStats), so means,
+# variances and min/max per gene and for fitness never need a pass over all
+# chromosomes.
+
+import heapq
+from .chromosome import GENES
+
+class RunningStat:
+    # Count, sum and sum of squares of a multiset of values, plus how often
+    # each value occurs so min/max survive removals. min/max come from a
+    # min-heap and a max-heap of the distinct values with lazy deletion:
+    # removed values are popped once they reach the top, and the heaps are
+    # rebuilt when they hold mostly removed values. Updates are O(log n),
+    # mean/variance O(1) and min/max O(1) amortized.
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.values = {}
+        self._low = []
+        self._high = []  # negated values
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        seen = self.values.get(value, 0)
+        self.values[value] = seen + 1
+        if not seen:
+            heapq.heappush(self._low, value)
+            heapq.heappush(self._high, -value)
+            if len(self._low) > 2 * len(self.values) + 16:
+                self._compact()
+
+    def remove(self, value):
+        self.count -= 1
+        self.total -= value
+        self.total_sq -= value * value
+        left = self.values[value] - 1
+        if left:
+            self.values[value] = left
+        else:
+            # Its heap entries go when they reach the top (or on _compact)
+            del self.values[value]
+
+    def replace(self, old, new):
+        if old != new:
+            self.remove(old)
+            self.add(new)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        # Population variance; clamp the float error of E[x^2] - E[x]^2
+        if not self.count:
+            return 0.0
+        mean = self.total / self.count
+        return max(0.0, self.total_sq / self.count - mean * mean)
+
+    def _compact(self):
+        self._low = list(self.values)
+        heapq.heapify(self._low)
+        self._high = [-value for value in self.values]
+        heapq.heapify(self._high)
+
+    @property
+    def min(self):
+        low, values = self._low, self.values
+        while low and low[0] not in values:
+            heapq.heappop(low)
+        return low[0] if low else None
+
+    @property
+    def max(self):
+        high, values = self._high, self.values
+        while high and -high[0] not in values:
+            heapq.heappop(high)
+        return -high[0] if high else None
+
+
+class ChromosomeStats:
+
+    def __init__(self):
+        self.genes = {gene: RunningStat() for gene in GENES}
+        self.fitness = RunningStat()
+
+    def __len__(self):
+        return self.fitness.count
+
+    def add(self, chromosome):
+        # A chromosome can be registered with one ChromosomeStats at a time
+        chromosome.stats = self
+        for gene in GENES:
+            self.genes[gene].add(getattr(chromosome, gene))
+        self.fitness.add(chromosome.fitness)
+
+    def remove(self, chromosome):
+        for gene in GENES:
+            self.genes[gene].remove(getattr(chromosome, gene))
+        self.fitness.remove(chromosome.fitness)
+        chromosome.stats = None
+
+    def fitness_changed(self, old, new):
+        self.fitness.replace(old, new)
+
+    def genes_changed(self, chromosome, old_genes):
+        for gene, old in zip(GENES, old_genes):
+            self.genes[gene].replace(old, getattr(chromosome, gene))
+
+    def mean(self, gene):
+        return self.genes[gene].mean
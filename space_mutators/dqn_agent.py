@@ -5,7 +5,7 @@ import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
+from .replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, MemmapReplayBuffer, FrameReplayBuffer
 
 class DQNNet(nn.Module):
     def __init__(self, state_dim, action_dim):
@@ -22,31 +22,57 @@ class DQNNet(nn.Module):
     def forward(self, x):
         return self.net(x)
 
-class ReplayBuffer:
-    def __init__(self, capacity=10000):
-        self.buffer = deque(maxlen=capacity)
-
-    def push(self, state, action, reward, next_state, done):
-        self.buffer.append((state, action, reward, next_state, done))
+class DQNConvNet(nn.Module):
+    # Compact CNN for pixel observations: (frame_stack, size, size) uint8 frames.
+    # Small enough to train on CPU (~160k weights at 64x64).
+    def __init__(self, state_shape, action_dim):
+        super().__init__()
+        channels, height, width = state_shape
+        self.features = nn.Sequential(
+            nn.Conv2d(channels, 16, kernel_size=8, stride=4),
+            nn.ReLU(),
+            nn.Conv2d(16, 32, kernel_size=4, stride=2),
+            nn.ReLU(),
+            nn.Flatten(),
+        )
+        with torch.no_grad():
+            num_features = self.features(torch.zeros(1, channels, height, width)).shape[1]
+        self.head = nn.Sequential(
+            nn.Linear(num_features, 128),
+            nn.ReLU(),
+            nn.Linear(128, action_dim)
+        )
 
-    def sample(self, batch_size):
-        samples = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones = zip(*samples)
-        return (np.array(states), 
-                actions,
-                np.array(rewards, dtype=np.float32),
-                np.array(next_states),
-                dones)
+    def forward(self, x):
+        # Frames are stored as 0..255, scale here so buffers can stay uint8
+        return self.head(self.features(x.float() / 255.0))
 
-    def __len__(self):
-        return len(self.buffer)
+def make_q_net(state_dim, action_dim):
+    # An int state_dim is the vector observation, a (C, H, W) shape a frame stack
+    if isinstance(state_dim, (tuple, list)):
+        return DQNConvNet(tuple(state_dim), action_dim)
+    return DQNNet(state_dim, action_dim)
 
 class DQNAgent:
+    # fast_path=True (default) removes per-step tensor construction:
+    #   - train_step reuses preallocated batch tensors; the replay buffer gathers
+    #     straight into their NumPy views (torch.from_numpy/.numpy() share memory),
+    #     optionally in pinned memory (pin_memory=True, only when CUDA is present)
+    #   - select_action/select_actions wrap states with torch.from_numpy and run
+    #     under torch.inference_mode, select_actions does one forward for a batch
+    # fast_path=False keeps the old FloatTensor/LongTensor/BoolTensor copies,
+    # so training throughput can be compared between the two.
     def __init__(self, state_dim, action_dim, lr=1e-3, gamma=0.99, 
                  epsilon_start=1.0, epsilon_end=0.01, epsilon_decay=100_000, 
-                 buffer_size=10000, batch_size=64):
+                 buffer_size=10000, batch_size=64, prioritized=False,
+                 per_alpha=0.6, per_beta_start=0.4, per_beta_frames=100_000,
+                 fast_path=True, pin_memory=False, replay_dir=None, frame_replay=False, seed=None):
+        # state_dim: int for vector observations, (C, H, W) for pixel frame stacks
         self.state_dim = state_dim
         self.action_dim = action_dim
+        self.pixels = isinstance(state_dim, (tuple, list))
+        self._state_shape = tuple(state_dim) if self.pixels else (state_dim,)
+        self._state_dtype = np.uint8 if self.pixels else np.float32
         self.gamma = gamma
         self.batch_size = batch_size
 
@@ -54,19 +80,68 @@ class DQNAgent:
         self.epsilon_end = epsilon_end
         self.epsilon_decay = epsilon_decay
         self.epsilon_step = 0
-
-        self.online_net = DQNNet(state_dim, action_dim)
-        self.target_net = DQNNet(state_dim, action_dim)
+        # Exploration streams; seed also fixes the network initialisation
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        if seed is not None:
+            torch.manual_seed(seed)
+
+        self.online_net = make_q_net(state_dim, action_dim)
+        self.target_net = make_q_net(state_dim, action_dim)
         self.target_net.load_state_dict(self.online_net.state_dict())
         self.target_net.eval()
 
         self.optim = optim.Adam(self.online_net.parameters(), lr=lr)
-        self.replay_buffer = ReplayBuffer(capacity=buffer_size)
+        # prioritized=True samples by TD-error through a sum-tree instead of uniformly,
+        # replay_dir keeps the replay on disk (memory-mapped) and resumes it if present
+        self.prioritized = prioritized
+        # frame_replay stores each frame of pixel observations once (see FrameReplayBuffer)
+        if self.prioritized and replay_dir is not None:
+            raise ValueError("Prioritized replay is kept in memory, it can't be combined with replay_dir")
+        if frame_replay and (not self.pixels or self.prioritized or replay_dir is not None):
+            raise ValueError("frame_replay needs pixel observations and plain uniform replay")
+        if frame_replay:
+            self.replay_buffer = FrameReplayBuffer(capacity=buffer_size, frame_stack=self._state_shape[0])
+        elif replay_dir is not None:
+            self.replay_buffer = MemmapReplayBuffer(replay_dir, capacity=buffer_size)
+        elif self.prioritized:
+            self.replay_buffer = PrioritizedReplayBuffer(capacity=buffer_size, alpha=per_alpha,
+                                                         beta_start=per_beta_start,
+                                                         beta_frames=per_beta_frames)
+        else:
+            self.replay_buffer = ReplayBuffer(capacity=buffer_size)
+        if seed is not None:
+            self.replay_buffer.rng = np.random.default_rng(seed)
+
+        self.fast_path = fast_path
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        if self.fast_path:
+            self._allocate_batch()
+
+    def _allocate_batch(self):
+        # Batch tensors reused by every train_step and their shared NumPy views
+        def empty(shape, dtype):
+            return torch.empty(shape, dtype=dtype, pin_memory=self.pin_memory)
+
+        b = self.batch_size
+        state_dtype = torch.uint8 if self.pixels else torch.float32
+        self._batch_t = (
+            empty((b,) + self._state_shape, state_dtype),
+            empty((b,), torch.int64),
+            empty((b,), torch.float32),
+            empty((b,) + self._state_shape, state_dtype),
+            empty((b,), torch.bool),
+        )
+        self._batch_np = tuple(t.numpy() for t in self._batch_t)
 
     def select_action(self, state):
         # Epsilon-greedy
-        if random.random() < self.epsilon:
-            return random.randint(0, self.action_dim - 1)
+        if self.rng.random() < self.epsilon:
+            return self.rng.randint(0, self.action_dim - 1)
+        elif self.fast_path:
+            with torch.inference_mode():
+                state_t = torch.from_numpy(np.asarray(state, dtype=self._state_dtype)).unsqueeze(0)
+                return self.online_net(state_t).argmax(dim=1).item()
         else:
             with torch.no_grad():
                 state_t = torch.FloatTensor(state).unsqueeze(0)
@@ -74,8 +149,20 @@ class DQNAgent:
                 action = q_values.argmax(dim=1).item()
             return action
 
-    def update_epsilon(self):
-        self.epsilon_step += 1
+    def select_actions(self, states):
+        # Epsilon-greedy for a batch of states (one row per env), one forward pass
+        states = np.asarray(states, dtype=self._state_dtype)
+        n = len(states)
+        explore = self.np_rng.random(n) < self.epsilon
+        actions = self.np_rng.integers(0, self.action_dim, size=n)
+        if not explore.all():
+            with torch.inference_mode():
+                greedy = self.online_net(torch.from_numpy(states)).argmax(dim=1).numpy()
+            actions = np.where(explore, actions, greedy)
+        return actions
+
+    def update_epsilon(self, steps=1):
+        self.epsilon_step += steps
         # Linear decay
         self.epsilon = max(self.epsilon_end, 
                            1.0 - self.epsilon_step / self.epsilon_decay)
@@ -87,13 +174,22 @@ class DQNAgent:
         if len(self.replay_buffer) < self.batch_size:
             return
         
-        states, actions, rewards, next_states, dones = self.replay_buffer.sample(self.batch_size)
+        out = self._batch_np if self.fast_path else None
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, indices, weights = \
+                self.replay_buffer.sample(self.batch_size, out=out)
+        else:
+            states, actions, rewards, next_states, dones = self.replay_buffer.sample(self.batch_size, out=out)
 
-        states_t = torch.FloatTensor(states)
-        actions_t = torch.LongTensor(actions)
-        rewards_t = torch.FloatTensor(rewards)
-        next_states_t = torch.FloatTensor(next_states)
-        dones_t = torch.BoolTensor(dones)
+        if self.fast_path:
+            # The buffer already wrote this batch into the preallocated tensors
+            states_t, actions_t, rewards_t, next_states_t, dones_t = self._batch_t
+        else:
+            states_t = torch.FloatTensor(states)
+            actions_t = torch.LongTensor(actions)
+            rewards_t = torch.FloatTensor(rewards)
+            next_states_t = torch.FloatTensor(next_states)
+            dones_t = torch.BoolTensor(dones)
 
         # Current Q estimates
         q_values = self.online_net(states_t)
@@ -106,11 +202,19 @@ class DQNAgent:
             next_q = self.target_net(next_states_t).gather(1, next_actions).squeeze(1)
             target_q = rewards_t + self.gamma * next_q * (~dones_t)
 
-        loss = nn.functional.mse_loss(q_values, target_q)
+        if self.prioritized:
+            # Importance-sampling weights correct for the non-uniform sampling
+            td_errors = target_q - q_values
+            loss = (torch.from_numpy(weights) * td_errors.pow(2)).mean()
+        else:
+            loss = nn.functional.mse_loss(q_values, target_q)
 
         self.optim.zero_grad()
         loss.backward()
         self.optim.step()
 
+        if self.prioritized:
+            self.replay_buffer.update_priorities(indices, td_errors.detach().numpy())
+
     def update_target_net(self):
         self.target_net.load_state_dict(self.online_net.state_dict())
@@ -1,76 +1,93 @@
 # enemy_ai.py
-import random
+import numpy as np
 
 class EnemyCoordinatorNetwork:
-    def __init__(self, num_enemies, input_size, hidden_size=8):
+    # Weights are NumPy arrays: w1 is (input_size, hidden_size), w2 is
+    # (hidden_size, output_size), so a forward pass is two matrix products.
+    # rng: a np.random.Generator for reproducible runs, None uses np.random
+    def __init__(self, num_enemies, input_size, hidden_size=8, rng=None):
         self.num_enemies = num_enemies
         self.input_size = input_size
         self.hidden_size = hidden_size
         self.output_size = num_enemies * 2
-        
+        # Kept as None rather than the np.random module so networks still pickle
+        self.rng = rng
+
         # Initialize weights and biases with a zero-centered normal distribution
-        def randn():
-            return random.gauss(0, 0.5)
-        
-        self.w1 = [[randn() for _ in range(hidden_size)] for _ in range(input_size)]
-        self.b1 = [randn() for _ in range(hidden_size)]
-        self.w2 = [[randn() for _ in range(self.output_size)] for _ in range(hidden_size)]
-        self.b2 = [randn() for _ in range(self.output_size)]
-    
-    def _relu(self, x):
-        return max(0.0, x)
+        def randn(*shape):
+            return self._rng().normal(0, 0.5, size=shape)
+
+        self.w1 = randn(input_size, hidden_size)
+        self.b1 = randn(hidden_size)
+        self.w2 = randn(hidden_size, self.output_size)
+        self.b2 = randn(self.output_size)
+
+    def _rng(self):
+        return self.rng if self.rng is not None else np.random
 
     def forward(self, input_vector):
-        hidden_activations = []
-        for i in range(self.hidden_size):
-            s = sum(input_vector[j] * self.w1[j][i] for j in range(self.input_size)) + self.b1[i]
-            hidden_activations.append(self._relu(s))
-        
-        outputs = []
-        for k in range(self.output_size):
-            s = sum(hidden_activations[i] * self.w2[i][k] for i in range(self.hidden_size)) + self.b2[k]
-            outputs.append(s)
-        
-        return outputs
+        hidden_activations = np.maximum(0.0, np.dot(input_vector, self.w1) + self.b1)
+        return np.dot(hidden_activations, self.w2) + self.b2
+
+    def forward_many(self, inputs):
+        # Many input vectors at once: (batch, input_size) -> (batch, output_size)
+        return self.forward(np.asarray(inputs, dtype=np.float64))
+
+    @staticmethod
+    def forward_population(networks, inputs):
+        # Many networks of the same shape at once.
+        # inputs is (num_networks, input_size) or (num_networks, batch, input_size)
+        w1 = np.stack([net.w1 for net in networks])
+        b1 = np.stack([net.b1 for net in networks])
+        w2 = np.stack([net.w2 for net in networks])
+        b2 = np.stack([net.b2 for net in networks])
+
+        inputs = np.asarray(inputs, dtype=np.float64)
+        single = inputs.ndim == 2
+        if single:
+            inputs = inputs[:, None, :]
+        hidden = np.maximum(0.0, np.matmul(inputs, w1) + b1[:, None, :])
+        outputs = np.matmul(hidden, w2) + b2[:, None, :]
+        return outputs[:, 0, :] if single else outputs
+
+    def encode(self, player_pos, enemy_positions):
+        # [player x, player y, enemy 1 x, enemy 1 y, ...] padded with zeros
+        features = np.zeros(self.input_size)
+        features[0], features[1] = player_pos
+        count = min(len(enemy_positions), self.num_enemies)
+        if count:
+            features[2:2 + 2 * count] = np.asarray(enemy_positions[:count], dtype=np.float64).ravel()
+        return features
 
     def compute_actions(self, player_pos, enemy_positions):
-        features = [player_pos[0], player_pos[1]]
-        for i in range(self.num_enemies):
-            if i < len(enemy_positions):
-                ex, ey = enemy_positions[i]
-                features.extend([ex, ey])
-            else:
-                features.extend([0.0, 0.0])
-        
-        outputs = self.forward(features)
-        dx_dy_pairs = [(outputs[2*i], outputs[2*i+1]) for i in range(self.num_enemies)]
+        outputs = self.forward(self.encode(player_pos, enemy_positions))
+        dx_dy_pairs = outputs.reshape(self.num_enemies, 2).tolist()
         return dx_dy_pairs
 
     def mutate(self, mutation_rate=0.1, mutation_strength=0.5):
-        # Mutate w1
-        for i in range(self.input_size):
-            for j in range(self.hidden_size):
-                if random.random() < mutation_rate:
-                    self.w1[i][j] += random.gauss(0, mutation_strength)
-        # Mutate b1
-        for i in range(self.hidden_size):
-            if random.random() < mutation_rate:
-                self.b1[i] += random.gauss(0, mutation_strength)
-        # Mutate w2
-        for i in range(self.hidden_size):
-            for j in range(self.output_size):
-                if random.random() < mutation_rate:
-                    self.w2[i][j] += random.gauss(0, mutation_strength)
-        # Mutate b2
-        for i in range(self.output_size):
-            if random.random() < mutation_rate:
-                self.b2[i] += random.gauss(0, mutation_strength)
-    
+        # Each weight/bias gets Gaussian noise with probability mutation_rate
+        rng = self._rng()
+        for params in (self.w1, self.b1, self.w2, self.b2):
+            mask = rng.random(params.shape) < mutation_rate
+            params += mask * rng.normal(0, mutation_strength, size=params.shape)
+
     def copy(self):
         # Returns a deep copy of this network
-        new_net = EnemyCoordinatorNetwork(self.num_enemies, self.input_size, self.hidden_size)
-        new_net.w1 = [list(row) for row in self.w1]
-        new_net.b1 = list(self.b1)
-        new_net.w2 = [list(row) for row in self.w2]
-        new_net.b2 = list(self.b2)
+        new_net = EnemyCoordinatorNetwork(self.num_enemies, self.input_size, self.hidden_size, rng=self.rng)
+        new_net.w1 = self.w1.copy()
+        new_net.b1 = self.b1.copy()
+        new_net.w2 = self.w2.copy()
+        new_net.b2 = self.b2.copy()
         return new_net
+
+    def save(self, path):
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2,
+                 num_enemies=self.num_enemies)
+
+    @staticmethod
+    def load(path):
+        data = np.load(path)
+        input_size, hidden_size = data["w1"].shape
+        net = EnemyCoordinatorNetwork(int(data["num_enemies"]), input_size, hidden_size)
+        net.w1, net.b1, net.w2, net.b2 = data["w1"], data["b1"], data["w2"], data["b2"]
+        return net
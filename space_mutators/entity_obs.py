@@ -0,0 +1,178 @@
+# entity_obs.py
+
+# Per-entity observations for SpaceMutatorsEnv(obs_mode="entities").
+#
+# GameSimulation(track_entities=True) mirrors every live enemy and bullet
+# into an EntityTable: fixed columns of NumPy arrays indexed by a slot the
+# body keeps for its lifetime. The simulation writes a body's row when it
+# spawns/moves and frees the slot when it dies, so the encoder below never
+# walks the Python lists - it masks the live slots, picks the K nearest to
+# the player with argpartition and fills a padded (K, features) block.
+
+import numpy as np
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from .chromosome import GENES, GENE_INIT_RANGES
+
+# Largest fresh gene value, genes are divided by it
+GENE_SCALE = np.array([GENE_INIT_RANGES[gene][1] - 1 for gene in GENES], dtype=np.float64)
+# Enemy velocities are a few pixels per tick (level included)
+VELOCITY_SCALE = 10.0
+# Multipliers for relative positions and for the dx/dy/genes columns
+SCREEN_SCALE = np.array([1.0 / SCREEN_WIDTH, 1.0 / SCREEN_HEIGHT])
+ENEMY_SCALE = np.concatenate([[1.0 / VELOCITY_SCALE] * 2, 1.0 / GENE_SCALE])
+
+# Per enemy: relative x/y, dx/dy, then the genes
+ENEMY_FEATURES = 4 + len(GENES)
+# Per bullet: relative x/y
+BULLET_FEATURES = 2
+# Same aggregate values as the 7-float vector observation
+AGGREGATE_DIM = 7
+
+
+class EntityTable:
+    # Struct-of-arrays store for one kind of body: one float64 row per slot in
+    # `data`, with every named column also exposed as a view (table.x,
+    # table.genes, ...). Growing reallocates `data` and the views, so look
+    # them up on the table instead of keeping references.
+
+    def __init__(self, columns, capacity=32):
+        # columns: [(name, width)], the views are 1-D for width 1
+        self.columns = columns
+        self.width = sum(width for _, width in columns)
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.data = np.zeros((0, self.width))
+        self.free = []
+        self._grow(capacity)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:old] = self.alive
+        data = np.zeros((capacity, self.width))
+        data[:old] = self.data
+        self.alive = alive
+        self.data = data
+        start = 0
+        for name, width in self.columns:
+            setattr(self, name, data[:, start] if width == 1 else data[:, start:start + width])
+            start += width
+        # Lowest slots are handed out first
+        self.free.extend(range(capacity - 1, old - 1, -1))
+        self.free.sort(reverse=True)
+        self.capacity = capacity
+
+    def add(self):
+        if not self.free:
+            self._grow(2 * self.capacity)
+        slot = self.free.pop()
+        self.alive[slot] = True
+        return slot
+
+    def remove(self, slot):
+        self.alive[slot] = False
+        self.free.append(slot)
+
+    def clear(self):
+        self.alive.fill(False)
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+
+def enemy_table():
+    # half_w/half_h turn x/y into the rect center (centerx == x + w // 2)
+    return EntityTable([("x", 1), ("y", 1), ("half_w", 1), ("half_h", 1),
+                        ("dx", 1), ("dy", 1), ("genes", len(GENES))])
+
+
+def bullet_table():
+    # Bullets share one size, only the center is tracked
+    return EntityTable([("cx", 1), ("cy", 1)])
+
+
+def nearest(d2, k):
+    # Indices of the k smallest squared distances, closest first
+    if len(d2) > k:
+        idx = np.argpartition(d2, k - 1)[:k]
+    else:
+        idx = np.arange(len(d2))
+    return idx[np.argsort(d2[idx], kind="stable")]
+
+
+class EntityObserver:
+    # Encodes a tracked GameSimulation into one flat float32 vector:
+    #   aggregate (7) | enemies (K, ENEMY_FEATURES) | enemy mask (K)
+    #                 | bullets (M, BULLET_FEATURES) | bullet mask (M)
+    # The named attributes below are views into that vector, padded rows are
+    # zero and masked out. Positions are relative to the player center and
+    # divided by the screen size.
+
+    def __init__(self, k_enemies=8, k_bullets=4):
+        self.k_enemies = k_enemies
+        self.k_bullets = k_bullets
+        sizes = [AGGREGATE_DIM, k_enemies * ENEMY_FEATURES, k_enemies,
+                 k_bullets * BULLET_FEATURES, k_bullets]
+        self.dim = sum(sizes)
+        self.obs = np.zeros(self.dim, dtype=np.float32)
+        parts = np.split(self.obs, np.cumsum(sizes)[:-1])
+        self.aggregate = parts[0]
+        self.enemies = parts[1].reshape(k_enemies, ENEMY_FEATURES)
+        self.enemy_mask = parts[2]
+        self.bullets = parts[3].reshape(k_bullets, BULLET_FEATURES)
+        self.bullet_mask = parts[4]
+
+    def split(self, obs):
+        # Structured views of an encoded vector (or a (batch, dim) array of them)
+        obs = np.asarray(obs)
+        sizes = [AGGREGATE_DIM, self.k_enemies * ENEMY_FEATURES, self.k_enemies,
+                 self.k_bullets * BULLET_FEATURES, self.k_bullets]
+        batch = obs.shape[:-1]
+        aggregate, enemies, enemy_mask, bullets, bullet_mask = np.split(obs, np.cumsum(sizes)[:-1], axis=-1)
+        return {
+            "aggregate": aggregate,
+            "enemies": enemies.reshape(batch + (self.k_enemies, ENEMY_FEATURES)),
+            "enemy_mask": enemy_mask,
+            "bullets": bullets.reshape(batch + (self.k_bullets, BULLET_FEATURES)),
+            "bullet_mask": bullet_mask,
+        }
+
+    def encode(self, sim):
+        # Fills and returns self.obs (shared buffer, overwritten next call)
+        player = sim.player
+        center = np.array([player.centerx, player.centery], dtype=np.float64)
+
+        table = sim.enemy_table
+        rows = table.data[table.alive]
+        centers = rows[:, 0:2] + rows[:, 2:4]
+        num_enemies = len(rows)
+
+        agg = self.aggregate
+        agg[0] = center[0] / float(SCREEN_WIDTH)
+        agg[1] = player.health / 100.0
+        agg[2] = num_enemies
+        agg[3] = centers[:, 1].sum() / (num_enemies * SCREEN_HEIGHT) if num_enemies else 0.0
+        agg[4] = len(sim.bullets)
+        agg[5] = sim.score
+        agg[6] = sim.escaped_enemies
+
+        rel = (centers - center) * SCREEN_SCALE
+        order = nearest(np.einsum("ij,ij->i", rel, rel), self.k_enemies)
+        n = len(order)
+        out = self.enemies
+        out[:n, 0:2] = rel[order]
+        out[:n, 2:] = rows[order, 4:] * ENEMY_SCALE
+        out[n:] = 0.0
+        self.enemy_mask[:n] = 1.0
+        self.enemy_mask[n:] = 0.0
+
+        table = sim.bullet_table
+        rel = (table.data[table.alive] - center) * SCREEN_SCALE
+        order = nearest(np.einsum("ij,ij->i", rel, rel), self.k_bullets)
+        n = len(order)
+        self.bullets[:n] = rel[order]
+        self.bullets[n:] = 0.0
+        self.bullet_mask[:n] = 1.0
+        self.bullet_mask[n:] = 0.0
+        return self.obs
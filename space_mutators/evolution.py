@@ -0,0 +1,145 @@
+# evolution.py
+
+# Offline evolution of EnemyCoordinatorNetwork.
+# A population of coordinators is evaluated in parallel (ProcessPoolExecutor)
+# by playing headless EvolvingGame rounds against a scripted or DQN player.
+# Each game is scored with evaluate_fitness, the same measure game_loop uses
+# to decide whether its network should mutate, and every generation keeps
+# the elite, then fills up with mutated copies of tournament winners.
+
+import os
+import time
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .enemy_ai import EnemyCoordinatorNetwork
+from .evolving_game import EvolvingGame
+from .space_mutators_env import observe
+
+class ScriptedPlayer:
+    # Chases the lowest enemy and fires every few frames once it is lined up
+    def __init__(self, fire_interval=6):
+        self.fire_interval = fire_interval
+        self.frame = 0
+
+    def act(self, sim):
+        self.frame += 1
+        player = sim.player
+        if not sim.enemies:
+            return 0
+        target = max(sim.enemies, key=lambda e: e.bottom)
+        offset = target.centerx - player.centerx
+        if abs(offset) <= target.w // 2:
+            return 3 if self.frame % self.fire_interval == 0 else 0
+        return 2 if offset > 0 else 1
+
+class DQNPlayer:
+    # Greedy policy of a trained DQNNet (torch is only imported for this player)
+    def __init__(self, model_path):
+        import torch
+        from .dqn_agent import DQNNet
+        self.torch = torch
+        state_dict = torch.load(model_path, map_location="cpu")
+        state_dim = state_dict["net.0.weight"].shape[1]
+        action_dim = state_dict["net.4.weight"].shape[0]
+        self.net = DQNNet(state_dim, action_dim)
+        self.net.load_state_dict(state_dict)
+        self.net.eval()
+
+    def act(self, sim):
+        with self.torch.inference_mode():
+            state_t = self.torch.from_numpy(observe(sim)).unsqueeze(0)
+            return self.net(state_t).argmax(dim=1).item()
+
+def make_player(player="scripted"):
+    # "scripted" or the path of a saved DQN model
+    if player == "scripted":
+        return ScriptedPlayer()
+    return DQNPlayer(player)
+
+def play_headless(ai_network, player, max_frames=3600, seed=None):
+    # One game with the same frame order as game_loop; returns its fitness.
+    # A seed gives the game its own random stream, same seed -> same game
+    rng = random.Random(seed) if seed is not None else None
+    game = EvolvingGame(ai_network, rng=rng)
+    sim = game.sim
+    for _ in range(max_frames):
+        if game.is_over():
+            break
+        sim.check_level()
+        sim.apply_action(player.act(sim))
+        game.spawn()
+        game.coordinate()
+        game.resolve()
+    return game.fitness()
+
+# Set once per worker process by _init_worker
+_worker_player = None
+
+def _init_worker(player):
+    # The DQN model is loaded once per worker, not once per game
+    global _worker_player
+    _worker_player = player if player == "scripted" else make_player(player)
+
+def _evaluate(args):
+    network, seeds, max_frames = args
+    scores = []
+    for seed in seeds:
+        # Scripted players keep a frame counter, so each game gets a fresh one
+        player = make_player() if _worker_player == "scripted" else _worker_player
+        scores.append(play_headless(network, player, max_frames=max_frames, seed=seed))
+    return sum(scores) / len(scores)
+
+def _tournament(population, fitnesses, size, rng):
+    picks = rng.sample(range(len(population)), size)
+    return population[max(picks, key=lambda i: fitnesses[i])]
+
+def evolve_coordinators(population_size=32, generations=50, elite=4, tournament_size=3,
+                        mutation_rate=0.1, mutation_strength=0.5, games_per_network=3,
+                        max_frames=3600, player="scripted", workers=None, seed=None,
+                        save_path="best_coordinator.npz"):
+    rng = random.Random(seed)
+    # One weight stream shared by every network, copy() hands it on, so
+    # initialisation and mutation are reproducible without global seeding
+    np_rng = np.random.default_rng(seed)
+
+    # Same shape as the network game_loop creates
+    population = [EnemyCoordinatorNetwork(num_enemies=10, input_size=2 + 2*10, hidden_size=8, rng=np_rng)
+                  for _ in range(population_size)]
+    workers = workers or os.cpu_count()
+    history = []
+    best_network, best_fitness = None, float("-inf")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(player,)) as pool:
+        for generation in range(generations):
+            start = time.perf_counter()
+            # Every network plays the same games this generation
+            seeds = [rng.randrange(2**31) for _ in range(games_per_network)]
+            jobs = [(network, seeds, max_frames) for network in population]
+            fitnesses = list(pool.map(_evaluate, jobs))
+
+            order = sorted(range(population_size), key=lambda i: fitnesses[i], reverse=True)
+            if fitnesses[order[0]] > best_fitness:
+                best_fitness = fitnesses[order[0]]
+                best_network = population[order[0]].copy()
+                if save_path:
+                    best_network.save(save_path)
+
+            mean_fitness = sum(fitnesses) / population_size
+            elapsed = time.perf_counter() - start
+            history.append((fitnesses[order[0]], mean_fitness, elapsed))
+            print(f"Generation {generation}: best={fitnesses[order[0]]:.2f}, mean={mean_fitness:.2f}, "
+                  f"best overall={best_fitness:.2f}, time={elapsed:.2f}s")
+
+            # Elitism, then mutated copies of tournament winners
+            next_population = [population[i].copy() for i in order[:elite]]
+            while len(next_population) < population_size:
+                child = _tournament(population, fitnesses, tournament_size, rng).copy()
+                child.mutate(mutation_rate=mutation_rate, mutation_strength=mutation_strength)
+                next_population.append(child)
+            population = next_population
+
+    return best_network, history
+
+if __name__ == "__main__":
+    evolve_coordinators()
@@ -0,0 +1,95 @@
+# evolving_game.py
+
+# The rules of the interactive game (game_loop) without any pygame:
+# enemies are bred from the chromosomes of dead enemies, moved by the
+# EnemyCoordinatorNetwork and rewarded for escaping or hitting the player.
+# game_loop adds input, heatmap and drawing around it; evolution.py plays
+# it headless against scripted or DQN players.
+
+import random
+from .chromosome import EnemyChromosome
+from .simulation import GameSimulation
+from .chromosome_stats import ChromosomeStats
+
+def evaluate_fitness(score, escaped_enemies, max_escaped):
+    # Evaluation of fitness
+    fitness = score - 10 * escaped_enemies
+    return fitness
+
+class EvolvingGame:
+    def __init__(self, ai_network, spawn_interval=80, max_levels=10, max_escaped=10, rng=None):
+        # Player, enemies, bullets, score and level live in the simulation core
+        # rng: random.Random for spawning and breeding (default: global random)
+        self.rng = rng if rng is not None else random
+        self.sim = GameSimulation(spawn_interval=spawn_interval, max_levels=max_levels,
+                                  max_escaped=max_escaped, rng=self.rng)
+        self.ai_network = ai_network
+        self.died_chromosomes = []
+        # Every chromosome of this game (alive or dead), registered on spawn
+        self.chromosome_stats = ChromosomeStats()
+
+    def is_over(self):
+        sim = self.sim
+        return (sim.player.health <= 0 or sim.escaped_enemies >= sim.max_escaped
+                or sim.level > sim.max_levels)
+
+    def fitness(self):
+        sim = self.sim
+        return evaluate_fitness(sim.score, sim.escaped_enemies, sim.max_escaped)
+
+    def spawn(self):
+        # Spawning
+        if self.sim.tick_spawn_timer():
+            died_chromosomes = self.died_chromosomes
+            rng = self.rng
+            if len(died_chromosomes) >= 2 and rng.random() < 0.7:
+                parentA = rng.choice(died_chromosomes)
+                parentB = rng.choice(died_chromosomes)
+                child_chrom = EnemyChromosome.crossover(parentA, parentB, rng)
+                child_chrom.mutate(mutation_rate=0.15, rng=rng)
+                enemy = self.sim.spawn_enemy(chromosome=child_chrom)
+            else:
+                enemy = self.sim.spawn_enemy()
+            self.chromosome_stats.add(enemy.chromosome)
+
+    def coordinate(self):
+        sim = self.sim
+        # Collect positions
+        enemy_positions = [(e.centerx, e.centery) for e in sim.enemies]
+        player_pos = (sim.player.centerx, sim.player.centery)
+
+        # -- AI Coordinator: produce movement deltas for each enemy --
+        # The order we pass them in is the order we apply the result.
+        deltas = self.ai_network.compute_actions(player_pos, enemy_positions)
+
+        # Now apply these deltas to each enemy
+        # If there are fewer than ai_network.num_enemies, we only read the first len(enemies) deltas
+        for i, enemy in enumerate(sim.enemies):
+            if i < len(deltas):
+                dx, dy = deltas[i]
+                # dx, dy might be large or small, so clamp or scale them:
+                dx = max(-2, min(2, dx))  # clamp for demonstration
+                dy = max(-1, min(3, dy))  # clamp so enemies generally move downward
+                enemy.move(dx, dy)
+
+    def resolve(self):
+        sim = self.sim
+        died_chromosomes = self.died_chromosomes
+
+        # Check if enemies escaped
+        for enemy in sim.remove_escaped():
+            enemy.chromosome.add_fitness(100)
+            died_chromosomes.append(enemy.chromosome)
+
+        sim.update_enemies()
+        sim.update_bullets()
+
+        # Bullet-enemy collisions (score is counted by the simulation)
+        for enemy in sim.collide_bullets():
+            enemy.chromosome.add_fitness(-20)
+            died_chromosomes.append(enemy.chromosome)
+
+        # Enemy-player collisions (health is taken by the simulation)
+        for enemy in sim.collide_player():
+            enemy.chromosome.add_fitness(50)
+            died_chromosomes.append(enemy.chromosome)
@@ -1,27 +1,44 @@
 import pygame
 import sys
-import random
-from .settings import HEATMAP_WIDTH, CHART_WIDTH, SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BLACK, WHITE, TOTAL_WIDTH
-from .sprite_defs import Player, Enemy, Bullet, EnemyChromosome
-from .utils import draw_text
+import numpy as np
+from .settings import HEATMAP_WIDTH, CHART_WIDTH, SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BLACK, WHITE, TOTAL_WIDTH, PANEL_REFRESH_INTERVAL
+from .evolving_game import EvolvingGame, evaluate_fitness  # evaluate_fitness used to live here
+from .renderer import DirtyGameRenderer, make_heatmap_surface, draw_heatmap
+from .heatmap import EnemyHeatmap
+from .timeseries import DownsampledSeries
+from .utils import draw_text, text_cache
 from .enemy_ai import EnemyCoordinatorNetwork  # <-- import our new AI class
 
-# 1) A global list to track average fitness over time.
-fitness_history = []
+# 1) A global history of average fitness over time.
+# Fixed memory: downsampled to at most one point per chart pixel.
+fitness_history = DownsampledSeries(CHART_WIDTH)
 
-def draw_chromosome_stats(screen, x_offset, y_offset, width, height, font, chromosomes):
-    # Example implementation from your existing code:
+STAT_BARS = 5
+STAT_BAR_HEIGHT = 30
+STAT_BAR_SPACING = 10
+
+def draw_chromosome_stats_chrome(screen, x_offset, y_offset, width, height):
+    # Static part of the stats panel: panel background and empty bars
     pygame.draw.rect(screen, (30, 30, 30), (x_offset, y_offset, width, height))
+    start_y = y_offset + 20
+    for i in range(STAT_BARS):
+        bar_top = start_y + i * (STAT_BAR_HEIGHT + STAT_BAR_SPACING)
+        bg_rect = pygame.Rect(x_offset + 10, bar_top, int(width * 0.8), STAT_BAR_HEIGHT)
+        pygame.draw.rect(screen, (80, 80, 80), bg_rect)
 
-    if not chromosomes:
+def draw_chromosome_stats(screen, x_offset, y_offset, width, height, font, stats, chrome=True):
+    # stats: ChromosomeStats, the averages are kept up to date incrementally
+    # chrome=False when the static part is already on screen (cached background)
+    if not len(stats):
+        pygame.draw.rect(screen, (30, 30, 30), (x_offset, y_offset, width, height))
         draw_text("No data", font, WHITE, screen, x_offset + width // 2, y_offset + height // 2)
         return
 
-    avg_speed = sum(c.speed_gene for c in chromosomes) / len(chromosomes)
-    avg_health = sum(c.health_gene for c in chromosomes) / len(chromosomes)
-    avg_bullet = sum(c.bullet_speed_gene for c in chromosomes) / len(chromosomes) #No Bullets for Enemies at the moment
-    avg_scale = sum(c.sprite_scale_gene for c in chromosomes) / len(chromosomes)
-    avg_color = sum(c.color_tint_gene for c in chromosomes) / len(chromosomes)
+    avg_speed = stats.mean("speed_gene")
+    avg_health = stats.mean("health_gene")
+    avg_bullet = stats.mean("bullet_speed_gene") #No Bullets for Enemies at the moment
+    avg_scale = stats.mean("sprite_scale_gene")
+    avg_color = stats.mean("color_tint_gene")
 
     max_speed = 10
     max_health = 5
@@ -37,19 +54,18 @@ def draw_chromosome_stats(screen, x_offset, y_offset, width, height, font, chrom
         ("Tint", avg_color, max_color),
     ]
 
-    bar_height = 30
-    spacing = 10
+    bar_height = STAT_BAR_HEIGHT
+    spacing = STAT_BAR_SPACING
     start_y = y_offset + 20
 
+    if chrome:
+        draw_chromosome_stats_chrome(screen, x_offset, y_offset, width, height)
+
     for i, (label, avg_val, max_val) in enumerate(data):
         bar_top = start_y + i * (bar_height + spacing)
         fraction = avg_val / max_val if max_val > 0 else 0
         bar_w = int(width * 0.8 * fraction)
 
-        # Draw background bar
-        bg_rect = pygame.Rect(x_offset + 10, bar_top, int(width * 0.8), bar_height)
-        pygame.draw.rect(screen, (80, 80, 80), bg_rect)
-
         # Draw filled portion
         fill_rect = pygame.Rect(x_offset + 10, bar_top, bar_w, bar_height)
         pygame.draw.rect(screen, (100, 200, 100), fill_rect)
@@ -58,70 +74,152 @@ def draw_chromosome_stats(screen, x_offset, y_offset, width, height, font, chrom
         draw_text(f"{label}: {avg_val:.1f}", font, WHITE, screen, x_offset + width // 2, bar_top + bar_height // 2)
 
 
-def evaluate_fitness(score, escaped_enemies, max_escaped):
-    # Evaluation of fitness
-    fitness = score - 10 * escaped_enemies
-    return fitness
-
+FITNESS_CHART_BG = (20, 20, 20)
+FITNESS_LINE_COLOR = (200, 200, 50)
+FITNESS_RANGE_COLOR = (90, 90, 30)
 
-def draw_fitness_chart(screen, x_offset, y_offset, width, height, font):
+def draw_fitness_chart_chrome(screen, x_offset, y_offset, width, height):
     # Clear background for the chart region
     chart_rect = pygame.Rect(x_offset, y_offset, width, height)
-    pygame.draw.rect(screen, (20, 20, 20), chart_rect)
-
-    count = len(fitness_history)
-    if count < 2:
-        # Not enough data to draw a line
-        draw_text("No fitness data", font, WHITE, screen, x_offset + width // 2, y_offset + height // 2)
+    pygame.draw.rect(screen, FITNESS_CHART_BG, chart_rect)
+
+def draw_fitness_series(screen, x_offset, y_offset, width, height, first=0, ranges=True, line=True):
+    # Range bands and/or mean line of fitness_history from bucket `first` on.
+    # Buckets sit at fixed x positions (at most one per pixel), so a new
+    # point never moves the ones already drawn
+    n = fitness_history.num_buckets
+    if n - first < 1:
         return
 
-    # Find min and max to scale the data
-    min_val = min(fitness_history)
-    max_val = max(fitness_history)
+    # Min and max of the whole session are tracked on append
+    min_val = fitness_history.min
+    max_val = fitness_history.max
     if min_val == max_val:
         max_val = min_val + 1  # Avoid div-by-zero
 
-    # We'll plot the data across the width
-    # x step: how many pixels per data point
-    x_step = width / (count - 1)  # if we have count data points, we do count-1 segments
+    x_step = width / (fitness_history.capacity - 1)
+    xs = x_offset + np.arange(first, n) * x_step
 
     # We invert y because top is smaller y
-    def transform(i, val):
-        px = x_offset + i * x_step
-        # rescale val -> [0..1]
-        fraction = (val - min_val) / (max_val - min_val)
-        # invert so higher fitness is "higher" in chart area
-        py = y_offset + height - fraction * height
-        return (px, py)
+    def transform(vals):
+        # rescale val -> [0..1], invert so higher fitness is "higher" in chart area
+        fraction = (vals - min_val) / (max_val - min_val)
+        return y_offset + height - fraction * height
+
+    # Once buckets hold several frames, shade each bucket's min..max range
+    if ranges and fitness_history.bucket_size > 1:
+        lows, highs = fitness_history.ranges()
+        for px, top, bottom in zip(xs, transform(highs[first:]), transform(lows[first:])):
+            pygame.draw.line(screen, FITNESS_RANGE_COLOR, (px, top), (px, bottom))
+
+    if line and len(xs) >= 2:
+        points = np.column_stack((xs, transform(fitness_history.means()[first:]))).tolist()
+        pygame.draw.lines(screen, FITNESS_LINE_COLOR, False, points, 2)
+
+def fitness_label(font, x_offset, y_offset, width):
+    # The last fitness value as (surface, rect) at its place in the chart
+    text_obj, text_rect = text_cache.render(font, f"Avg Fitness: {fitness_history.last:.1f}", WHITE)
+    text_rect.center = (x_offset + width // 2, y_offset + 20)
+    return text_obj, text_rect
+
+def draw_fitness_chart(screen, x_offset, y_offset, width, height, font, chrome=True):
+    if chrome:
+        draw_fitness_chart_chrome(screen, x_offset, y_offset, width, height)
 
-    points = [transform(i, val) for i, val in enumerate(fitness_history)]
+    count = len(fitness_history)
+    if count < 2:
+        # Not enough data to draw a line
+        draw_text("No fitness data", font, WHITE, screen, x_offset + width // 2, y_offset + height // 2)
+        return None
 
-    # Draw lines between consecutive points
-    for i in range(len(points) - 1):
-        pygame.draw.line(screen, (200, 200, 50), points[i], points[i+1], 2)
+    draw_fitness_series(screen, x_offset, y_offset, width, height)
 
     # Optionally draw the last fitness numeric
-    last_val = fitness_history[-1]
-    draw_text(f"Avg Fitness: {last_val:.1f}", font, WHITE, screen, x_offset + width // 2, y_offset + 20)
-
-def game_loop(screen, clock, font_small, bg_img):
+    text_obj, text_rect = fitness_label(font, x_offset, y_offset, width)
+    screen.blit(text_obj, text_rect)
+    return text_rect
+
+class FitnessChart:
+    # The fitness chart on its own surface. Redrawn in full only when the
+    # history was restarted or the whole chart moves: buckets merged
+    # (bucket_size), or a new session min/max rescaled the y axis. Otherwise
+    # appends only repaint the strip from the last drawn segment to the right
+    # edge plus the label, over what is already on the surface.
+
+    # Segments redrawn to the left of the repainted strip, so thick lines
+    # crossing its left edge come out the same as in a full redraw
+    OVERLAP = 6
+    # Repaints clip the background and the (vertical) range bands, but the
+    # line is drawn unclipped: pygame rasterises clipped slanted lines
+    # differently, and redrawing line pixels outside the area is harmless
+    # because they are the same pixels in the same color.
+
+    def __init__(self, width, height, font):
+        self.surface = pygame.Surface((width, height)).convert()
+        self.font = font
+        self.layout = None  # (history, bucket_size, min, max) of the drawing
+        self.version = None
+        self.drawn = 0  # buckets on the surface
+        self.text_rect = None
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def _repaint(self, clip, first):
+        # Chart background and series from bucket `first` over the clip area
+        width, height = self.surface.get_size()
+        self.surface.set_clip(clip)
+        draw_fitness_chart_chrome(self.surface, 0, 0, width, height)
+        draw_fitness_series(self.surface, 0, 0, width, height, first, line=False)
+        self.surface.set_clip(None)
+        draw_fitness_series(self.surface, 0, 0, width, height, first, ranges=False)
+
+    def _update(self):
+        history = fitness_history
+        width, height = self.surface.get_size()
+
+        # The last drawn bucket may have changed since, so repaint from the
+        # segment that ends in it
+        start = max(0, self.drawn - 2)
+        left = max(0, int(start * width / (history.capacity - 1)) - 2)
+        self._repaint(pygame.Rect(left, 0, width - left, height), max(0, start - self.OVERLAP))
+
+        # The label changes with every append: repaint under the old and new text
+        text_obj, text_rect = fitness_label(self.font, 0, 0, width)
+        label_area = text_rect.union(self.text_rect)
+        self._repaint(label_area, 0)
+        self.surface.blit(text_obj, text_rect)
+        self.text_rect = text_rect
+
+    def draw(self, screen, x_offset, y_offset):
+        history = fitness_history
+        layout = (history, history.bucket_size, history.min, history.max)
+        if layout != self.layout or len(history) < 2 or self.text_rect is None:
+            width, height = self.surface.get_size()
+            self.text_rect = draw_fitness_chart(self.surface, 0, 0, width, height, self.font)
+            self.full_redraws += 1
+        elif history.version != self.version:
+            self._update()
+            self.partial_redraws += 1
+        self.layout = layout
+        self.version = history.version
+        self.drawn = history.num_buckets
+        return screen.blit(self.surface, (x_offset, y_offset))
+
+def build_background(bg_img):
+    # Everything that never changes: game background and the empty panels
+    background = pygame.Surface((TOTAL_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(BLACK)
+    if bg_img:
+        background.blit(bg_img, (0, 0))
+    chart_w = TOTAL_WIDTH - SCREEN_WIDTH - HEATMAP_WIDTH
+    half_h = SCREEN_HEIGHT // 2
+    draw_chromosome_stats_chrome(background, SCREEN_WIDTH, 0, chart_w, half_h)
+    draw_fitness_chart_chrome(background, SCREEN_WIDTH, half_h, chart_w, half_h)
+    return background
+
+def game_loop(screen, clock, font_small, bg_img, panel_interval=PANEL_REFRESH_INTERVAL):
     global fitness_history
 
-    level = 1
-    max_levels = 10
-    player = Player()
-    all_sprites = pygame.sprite.Group(player)
-    enemies = pygame.sprite.Group()
-    bullets = pygame.sprite.Group()
-
-    score = 0
-    spawn_timer = 0
-    escaped_enemies = 0
-    max_escaped = 10
-    spawn_interval = 80
-
-    died_chromosomes = []
-
     # Increased Enemy in the Network 
     ai_network = EnemyCoordinatorNetwork(
         num_enemies=10,   # number of enemies the net can handle at once
@@ -129,140 +227,88 @@ def game_loop(screen, clock, font_small, bg_img):
         hidden_size=8
     )
 
-    # Initialize the heatmap surface (150px wide strip on the right)
-    heatmap_surface = pygame.Surface((HEATMAP_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    heatmap_surface.fill((0, 0, 0, 0))  # start fully transparent
+    # Game rules (breeding, coordinator, fitness awards) without the drawing
+    game = EvolvingGame(ai_network, spawn_interval=80, max_levels=10, max_escaped=10)
+    sim = game.sim
+    player = sim.player
+    chromosome_stats = game.chromosome_stats
+    # Only changed regions are redrawn; panels every panel_interval frames
+    renderer = DirtyGameRenderer(screen, build_background(bg_img), font_small, panel_interval)
+    stats_rect = pygame.Rect(SCREEN_WIDTH, 0, CHART_WIDTH, SCREEN_HEIGHT // 2)
+    chart_rect = pygame.Rect(SCREEN_WIDTH, SCREEN_HEIGHT // 2, CHART_WIDTH, SCREEN_HEIGHT // 2)
+    heatmap_rect = pygame.Rect(SCREEN_WIDTH + CHART_WIDTH, 0, HEATMAP_WIDTH, SCREEN_HEIGHT)
+
+    # Set a threshold for fitness (you can adjust this value)
+    fitness_threshold = 50
+
+    # Initialize the heatmap (300px wide strip on the right): a decaying
+    # NumPy density grid, copied into one reused surface when it is shown
+    heatmap = EnemyHeatmap(HEATMAP_WIDTH, SCREEN_HEIGHT)
+    heatmap_surface = make_heatmap_surface(heatmap)
 
     # Clear fitness_history each new game session
-    fitness_history = []
+    fitness_history = DownsampledSeries(CHART_WIDTH)
+    fitness_chart = FitnessChart(CHART_WIDTH, SCREEN_HEIGHT // 2, font_small)
 
     while True:
         clock.tick(FPS)
 
         # End conditions
-        if player.health <= 0 or escaped_enemies >= max_escaped:
+        if player.health <= 0 or sim.escaped_enemies >= sim.max_escaped:
             # At the end of a level or when the game is over, evaluate fitness.
-            fitness = evaluate_fitness(score, escaped_enemies, max_escaped)
-            print(f"Level {level} ended. Fitness: {fitness}")
+            fitness = game.fitness()
+            print(f"Level {sim.level} ended. Fitness: {fitness}")
+            avg_ms, worst_ms = renderer.draw_time_stats()
+            print(f"Draw time: {avg_ms:.2f} ms/frame average, {worst_ms:.2f} ms worst")
             # If fitness is lower than threshold, evolve the network.
             if fitness < fitness_threshold:
                 print("Mutating network...")
                 ai_network.mutate(mutation_rate=0.1, mutation_strength=0.5)
             return
-        if score >= 20 * level and level < max_levels:
-            level += 1
-        if level > max_levels:
+        sim.check_level()
+        if sim.level > sim.max_levels:
             return
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                bullet = Bullet(player.rect.centerx, player.rect.top)
-                all_sprites.add(bullet)
-                bullets.add(bullet)
+                sim.shoot()
 
         # Spawning
-        spawn_timer += 1
-        if spawn_timer >= spawn_interval:
-            spawn_timer = 0
-            if len(died_chromosomes) >= 2 and random.random() < 0.7:
-                parentA = random.choice(died_chromosomes)
-                parentB = random.choice(died_chromosomes)
-                child_chrom = EnemyChromosome.crossover(parentA, parentB)
-                child_chrom.mutate(mutation_rate=0.15)
-                enemy = Enemy(level, chromosome=child_chrom)
-            else:
-                enemy = Enemy(level)
-            all_sprites.add(enemy)
-            enemies.add(enemy)
+        game.spawn()
 
         pressed_keys = pygame.key.get_pressed()
-        player.update(pressed_keys)
+        if pressed_keys[pygame.K_LEFT] and player.left > 0:
+            player.x -= player.speed
+        if pressed_keys[pygame.K_RIGHT] and player.right < SCREEN_WIDTH:
+            player.x += player.speed
 
         # --- Update Heatmap ---
-        # Fade previous frame data by overlaying a semi-transparent black rectangle
-        fade = pygame.Surface((HEATMAP_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        fade.fill((0, 0, 0, 25))
-        heatmap_surface.blit(fade, (0, 0))
-        # Plot enemy positions (scale enemy x from game area to heatmap width)
-        for enemy in enemies:
-            # enemy.rect.centerx is between 0 and GAME_WIDTH (600)
-            heatmap_x = int(enemy.rect.centerx * (HEATMAP_WIDTH / SCREEN_WIDTH))
-            heatmap_y = enemy.rect.centery
-            pygame.draw.circle(heatmap_surface, (255, 0, 0, 150), (heatmap_x, heatmap_y), 5)
-                
-        # Collect positions
-        enemy_positions = [(e.rect.centerx, e.rect.centery) for e in enemies]
-        player_pos = (player.rect.centerx, player.rect.centery)
-
-        # -- AI Coordinator: produce movement deltas for each enemy --
-        # The order we pass them in is the order we apply the result.
-        deltas = ai_network.compute_actions(player_pos, enemy_positions)
-
-        # Set a threshold for fitness (you can adjust this value)
-        fitness_threshold = 50
-
-        # Now apply these deltas to each enemy
-        # If there are fewer than ai_network.num_enemies, we only read the first len(enemies) deltas
-        for i, enemy in enumerate(enemies):
-            if i < len(deltas):
-                dx, dy = deltas[i]
-                # dx, dy might be large or small, so clamp or scale them:
-                dx = max(-2, min(2, dx))  # clamp for demonstration
-                dy = max(-1, min(3, dy))  # clamp so enemies generally move downward
-                enemy.rect.x += dx
-                enemy.rect.y += dy
-
-        # Check if enemies escaped
-        for enemy in enemies.copy():
-            if enemy.rect.top > SCREEN_HEIGHT:
-                enemy.chromosome.add_fitness(100)
-                escaped_enemies += 1
-                died_chromosomes.append(enemy.chromosome)
-                enemy.kill()
-
-        enemies.update()
-        bullets.update()
-
-        # Bullet-enemy collisions
-        collisions = pygame.sprite.groupcollide(enemies, bullets, True, True)
-        for enemy in collisions.keys():
-            score += 1
-            enemy.chromosome.add_fitness(-20)
-            died_chromosomes.append(enemy.chromosome)
-
-        # Enemy-player collisions
-        collided_enemies = pygame.sprite.spritecollide(player, enemies, True)
-        for enemy in collided_enemies:
-            player.health -= 20
-            enemy.chromosome.add_fitness(50)
-            died_chromosomes.append(enemy.chromosome)
-
-        # Drawing
-        if bg_img:
-            screen.blit(bg_img, (0, 0))
-        else:
-            screen.fill(BLACK)
+        # Fade previous frame data, then plot enemy positions (x scaled to heatmap width)
+        heatmap.update(sim.enemies)
 
-        # Left side (0..SCREEN_WIDTH): the main game
-        all_sprites.draw(screen)
-        player.draw_health_bar(screen)
-
-        draw_text(f"Score: {score}", font_small, WHITE, screen, 60, 20)
-        draw_text(f"Level: {level}", font_small, WHITE, screen, SCREEN_WIDTH - 60, 20)
-        draw_text(f"Escaped: {escaped_enemies}/{max_escaped}", font_small, WHITE, screen, SCREEN_WIDTH // 2, 20)
+        # -- AI Coordinator moves the enemies, then escapes/collisions --
+        game.coordinate()
+        game.resolve()
 
         # Adaptive Difficulty alignment
-        if score >= 50 and player.health >= 80:
+        if sim.score >= 50 and player.health >= 80:
             difficulty_feedback = "Hard"
-        elif score >= 20 and player.health >= 50:
+        elif sim.score >= 20 and player.health >= 50:
             difficulty_feedback = "Normal"
         else:
             difficulty_feedback = "Easy"
 
-        # Draw the adaptive difficulty feedback near the bottom center of the screen
-        draw_text(f"Adaptive Difficulty: {difficulty_feedback}", font_small, WHITE, screen, SCREEN_WIDTH // 2, 90)
+        # Drawing
+        # Left side (0..SCREEN_WIDTH): the main game, only the dirty rects
+        dirty_rects = renderer.draw(sim, [
+            (f"Score: {sim.score}", 60, 20),
+            (f"Level: {sim.level}", SCREEN_WIDTH - 60, 20),
+            (f"Escaped: {sim.escaped_enemies}/{sim.max_escaped}", SCREEN_WIDTH // 2, 20),
+            # Draw the adaptive difficulty feedback near the bottom center of the screen
+            (f"Adaptive Difficulty: {difficulty_feedback}", SCREEN_WIDTH // 2, 90),
+        ])
 
         # ==============================
         # == Right side: charts & stats
@@ -272,23 +318,23 @@ def game_loop(screen, clock, font_small, bg_img):
         chart_w = TOTAL_WIDTH - SCREEN_WIDTH - HEATMAP_WIDTH
         chart_h = SCREEN_HEIGHT
 
-        # Top half for gene stats
+        # Top half for gene stats (alive and dead chromosomes)
         half_h = chart_h // 2
-        all_chromosomes = [enemy.chromosome for enemy in enemies] + died_chromosomes
-        draw_chromosome_stats(screen, chart_x, chart_y, chart_w, half_h, font_small, all_chromosomes)
 
         # Bottom half for fitness chart
-        # 1) Calculate average fitness from all chromosomes
-        if all_chromosomes:
-            avg_fitness = sum(c.fitness for c in all_chromosomes) / len(all_chromosomes)
-        else:
-            avg_fitness = 0.0
+        # 1) Average fitness from all chromosomes, maintained incrementally
+        avg_fitness = chromosome_stats.fitness.mean
         # 2) Append to the history
         fitness_history.append(avg_fitness)
-        # 3) Draw the line chart
-        draw_fitness_chart(screen, chart_x, chart_y + half_h, chart_w, half_h, font_small)
-
-        screen.blit(heatmap_surface, (SCREEN_WIDTH+CHART_WIDTH, 0))  # Heatmap on the right
-
 
-        pygame.display.flip()
+        # 3) Panels are repainted at a lower rate over their cached chrome
+        if renderer.panel_due():
+            renderer.restore(stats_rect)
+            draw_chromosome_stats(screen, chart_x, chart_y, chart_w, half_h, font_small, chromosome_stats, chrome=False)
+            fitness_chart.draw(screen, chart_x, chart_y + half_h)
+            renderer.restore(heatmap_rect)
+            draw_heatmap(heatmap_surface, heatmap)
+            screen.blit(heatmap_surface, heatmap_rect)  # Heatmap on the right
+            dirty_rects += [stats_rect, chart_rect, heatmap_rect]
+
+        renderer.present(dirty_rects)
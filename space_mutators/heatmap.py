@@ -0,0 +1,143 @@
+# heatmap.py
+
+# Enemy position heatmap as a NumPy density grid (no pygame).
+# game_loop shows the decaying `grid` next to the game (renderer.draw_heatmap),
+# training runs keep the undecayed `occupancy` and save it as an .npy file.
+
+import numpy as np
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, HEATMAP_WIDTH
+
+# Same look as the old Surface version: a 25/255 black fade per frame and
+# a radius 5 circle of alpha 150 per enemy
+HEATMAP_DECAY = 1 - 25 / 255
+HEATMAP_RADIUS = 5
+HEATMAP_INTENSITY = 150 / 255
+
+class EnemyHeatmap:
+    # Every per-frame array is preallocated: enemy positions and disk pixels
+    # are written into buffers sized for max_enemies (doubled if a frame has
+    # more), and grid/occupancy carry a one pixel border so off-screen points
+    # are clipped onto it instead of masked out. grid and occupancy are the
+    # visible interiors of those padded arrays.
+    # display=False (headless runs) only allocates the occupancy counts.
+    def __init__(self, width=HEATMAP_WIDTH, height=SCREEN_HEIGHT, decay=HEATMAP_DECAY,
+                 radius=HEATMAP_RADIUS, intensity=HEATMAP_INTENSITY, display=True, max_enemies=64):
+        self.width = width
+        self.height = height
+        self.decay = decay
+        self.intensity = intensity
+        self.display = display
+        # Game coordinates -> heatmap pixels
+        self.scale_x = width / SCREEN_WIDTH
+        self.scale_y = height / SCREEN_HEIGHT
+
+        # Indexed [x, y] like pygame.surfarray
+        # Enemy centers per pixel over all updates, never decayed
+        self._occupancy = np.zeros((width + 2, height + 2), dtype=np.int64)
+        self.occupancy = self._occupancy[1:-1, 1:-1]
+        self.frames = 0
+
+        # Pixel offsets of the disk every enemy is splatted with
+        dx, dy = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        inside = dx * dx + dy * dy <= radius * radius
+        self._dx = dx[inside]
+        self._dy = dy[inside]
+
+        self.grid = None
+        self._alpha = None
+        if display:
+            self._grid = np.zeros((width + 2, height + 2), dtype=np.float32)
+            self.grid = self._grid[1:-1, 1:-1]
+            # Reused output buffer for alpha()
+            self._alpha = np.zeros((width, height), dtype=np.float32)
+        self._allocate(max_enemies)
+
+    def _allocate(self, max_enemies):
+        self.max_enemies = max_enemies
+        self._scaled = np.zeros(max_enemies, dtype=np.float64)
+        self._xs = np.zeros(max_enemies, dtype=np.int64)
+        self._ys = np.zeros(max_enemies, dtype=np.int64)
+        self._cx = np.zeros(max_enemies, dtype=np.int64)
+        self._cy = np.zeros(max_enemies, dtype=np.int64)
+        if self.display:
+            self._px = np.zeros((max_enemies, len(self._dx)), dtype=np.int64)
+            self._py = np.zeros((max_enemies, len(self._dy)), dtype=np.int64)
+
+    def reset(self):
+        if self.display:
+            self._grid.fill(0.0)
+        self._occupancy.fill(0)
+        self.frames = 0
+
+    def positions(self, enemies):
+        # Heatmap pixel of every enemy center (views of shared buffers,
+        # overwritten next call)
+        count = len(enemies)
+        if count > self.max_enemies:
+            self._allocate(2 * count)
+        scaled = self._scaled[:count]
+        for i, enemy in enumerate(enemies):
+            scaled[i] = enemy.centerx
+        scaled *= self.scale_x
+        xs = self._xs[:count]
+        np.copyto(xs, scaled, casting="unsafe")  # truncates like astype
+        for i, enemy in enumerate(enemies):
+            scaled[i] = enemy.centery
+        scaled *= self.scale_y
+        ys = self._ys[:count]
+        np.copyto(ys, scaled, casting="unsafe")
+        return xs, ys
+
+    def splat(self, xs, ys):
+        # Add a disk around every (x, y) in one np.add.at, overlaps accumulate
+        count = len(xs)
+        px = self._px[:count]
+        py = self._py[:count]
+        np.add(xs[:, None], self._dx, out=px)
+        np.add(ys[:, None], self._dy, out=py)
+        self._clip(px, py)
+        np.add.at(self._grid, (px.ravel(), py.ravel()), self.intensity)
+
+    def record(self, xs, ys):
+        count = len(xs)
+        cx = self._cx[:count]
+        cy = self._cy[:count]
+        np.copyto(cx, xs)
+        np.copyto(cy, ys)
+        self._clip(cx, cy)
+        np.add.at(self._occupancy, (cx, cy), 1)
+
+    def _clip(self, px, py):
+        # Pixel coordinates -> padded array indices, off-heatmap points onto the border
+        px += 1
+        py += 1
+        np.clip(px, 0, self.width + 1, out=px)
+        np.clip(py, 0, self.height + 1, out=py)
+
+    def update(self, enemies):
+        # One frame: decay in place, then splat and count the current enemies
+        if not self.display:
+            self.accumulate(enemies)
+            return
+        self._grid *= self.decay
+        self.frames += 1
+        if enemies:
+            xs, ys = self.positions(enemies)
+            self.splat(xs, ys)
+            self.record(xs, ys)
+
+    def accumulate(self, enemies):
+        # Occupancy only, for headless runs that never show the heatmap
+        self.frames += 1
+        if enemies:
+            self.record(*self.positions(enemies))
+
+    def alpha(self):
+        # grid as 0..255 alpha values (shared buffer, overwritten next call)
+        np.multiply(self.grid, 255.0, out=self._alpha)
+        np.minimum(self._alpha, 255.0, out=self._alpha)
+        return self._alpha
+
+    def save(self, path):
+        # Occupancy as [y, x] (row per screen line) for plotting/analysis
+        np.save(path, self.occupancy.T)
@@ -0,0 +1,75 @@
+# pixels.py
+
+# Pixel observations for SpaceMutatorsEnv(obs_mode="pixels").
+# The playfield is rasterised straight at the observation resolution into an
+# 8-bit grayscale surface (no display needed), read through
+# pygame.surfarray.pixels2d without copying, and pushed into a frame stack.
+
+import pygame
+import numpy as np
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Gray levels of the entities (background is 0)
+ENEMY_SHADE = 128
+BULLET_SHADE = 200
+PLAYER_SHADE = 255
+
+class PixelObserver:
+    def __init__(self, frame_size=64, frame_stack=4):
+        self.frame_size = frame_size
+        self.frame_stack = frame_stack
+        self.scale_x = frame_size / SCREEN_WIDTH
+        self.scale_y = frame_size / SCREEN_HEIGHT
+
+        # Palette index == gray level, so the raw 8-bit pixels are the image
+        self.surface = pygame.Surface((frame_size, frame_size), depth=8)
+        self.surface.set_palette([(i, i, i) for i in range(256)])
+        # [x, y] view into the surface memory, valid as long as the surface lives
+        self.pixels = pygame.surfarray.pixels2d(self.surface)
+
+        # Every frame is written twice (slot i and i + frame_stack) so the
+        # last frame_stack frames, oldest first, are always the contiguous
+        # view frames[i + 1:i + 1 + frame_stack]
+        self.frames = np.zeros((2 * frame_stack, frame_size, frame_size), dtype=np.uint8)
+        self.index = 0
+
+    @property
+    def shape(self):
+        return (self.frame_stack, self.frame_size, self.frame_size)
+
+    def _fill(self, body, shade):
+        # Scaled rect, at least one pixel so 4px bullets never vanish
+        x = int(body.x * self.scale_x)
+        y = int(body.y * self.scale_y)
+        w = max(1, int(body.w * self.scale_x + 0.5))
+        h = max(1, int(body.h * self.scale_y + 0.5))
+        self.surface.fill(shade, (x, y, w, h))
+
+    def _draw(self, sim):
+        self.surface.fill(0)
+        for enemy in sim.enemies:
+            self._fill(enemy, ENEMY_SHADE)
+        for bullet in sim.bullets:
+            self._fill(bullet, BULLET_SHADE)
+        self._fill(sim.player, PLAYER_SHADE)
+
+    def reset(self, sim):
+        # The stack starts as frame_stack copies of the first frame
+        self._draw(sim)
+        self.frames[:] = self.pixels.T
+        self.index = self.frame_stack - 1
+        return self.stack()
+
+    def observe(self, sim):
+        self._draw(sim)
+        i = (self.index + 1) % self.frame_stack
+        frame = self.pixels.T  # (y, x) view, no copy
+        self.frames[i] = frame
+        self.frames[i + self.frame_stack] = frame
+        self.index = i
+        return self.stack()
+
+    def stack(self):
+        # (frame_stack, frame_size, frame_size) view, overwritten by the next observe()
+        i = self.index
+        return self.frames[i + 1:i + 1 + self.frame_stack]
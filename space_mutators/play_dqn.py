@@ -3,11 +3,13 @@ import torch
 import pygame
 from .space_mutators_env import SpaceMutatorsEnv, ACTIONS
 from .dqn_agent import DQNAgent
+from .recording import EpisodeRecorder
 
-def play_dqn(model_path="dqn_model.pth"):
+def play_dqn(model_path="dqn_model.pth", record_path=None, seed=None):
+    # record_path saves the episode (seed + actions) for recording.replay
 
-    # 1. Create environment with a window so we can see the AI play.
-    env = SpaceMutatorsEnv(render=True)
+    # 1. Create environment with a window so we can see the AI play (at game speed).
+    env = SpaceMutatorsEnv(render=True, realtime=True)
     state_dim = env.reset().shape[0]
     action_dim = len(ACTIONS)
 
@@ -21,7 +23,8 @@ def play_dqn(model_path="dqn_model.pth"):
 
     # 3. Play one episode (or loop until done)
     done = False
-    state = env.reset()
+    recorder = EpisodeRecorder(env)
+    state = recorder.reset(seed=seed)
     episode_reward = 0.0
 
     while not done:
@@ -34,12 +37,16 @@ def play_dqn(model_path="dqn_model.pth"):
         action = agent.select_action(state)
         
         # Step the environment
-        next_state, reward, done, info = env.step(action)
+        next_state, reward, done, info = recorder.step(action)
         episode_reward += reward
         state = next_state
 
     env.close()
     print(f"Game over. Episode reward = {episode_reward:.2f}")
+    if record_path is not None:
+        recording = recorder.recording or recorder.finish()
+        recording.save(record_path)
+        print(f"Saved episode recording (seed {recording.seed}, {len(recording)} steps) to {record_path}")
 
 if __name__ == "__main__":
     play_dqn("dqn_model.pth")
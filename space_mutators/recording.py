@@ -0,0 +1,144 @@
+# recording.py
+
+# Compact episode recordings: the env seed, the action taken every step
+# (one uint8 each) and the outcome the episode ended with. A seeded
+# SpaceMutatorsEnv is deterministic, so replay() can re-simulate any recorded
+# episode headless at full speed and check it still ends the same way. That
+# makes recordings usable as fixed benchmark workloads and as regression
+# checks for simulation changes.
+#
+#   python -m space_mutators.recording episode.npz [more.npz ...]
+
+import sys
+import time
+import random
+import numpy as np
+from .space_mutators_env import SpaceMutatorsEnv
+
+# What an episode is compared on
+OUTCOME_KEYS = ("steps", "reward", "score", "escaped", "health", "level", "done")
+
+
+def episode_outcome(env, steps, reward):
+    sim = env.sim
+    return {
+        "steps": steps,
+        "reward": float(reward),
+        "score": sim.score,
+        "escaped": sim.escaped_enemies,
+        "health": sim.player.health,
+        "level": sim.level,
+        "done": bool(env.done),
+    }
+
+
+class EpisodeRecording:
+    def __init__(self, seed, actions, action_repeat=1, outcome=None):
+        self.seed = seed
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        self.action_repeat = action_repeat
+        self.outcome = outcome
+
+    def __len__(self):
+        return len(self.actions)
+
+    def save(self, path):
+        outcome = self.outcome or {}
+        np.savez_compressed(path, seed=self.seed, actions=self.actions,
+                            action_repeat=self.action_repeat,
+                            **{"outcome_" + key: value for key, value in outcome.items()})
+
+    @staticmethod
+    def load(path):
+        data = np.load(path)
+        outcome = {key: data["outcome_" + key].item() for key in OUTCOME_KEYS
+                   if "outcome_" + key in data}
+        return EpisodeRecording(int(data["seed"]), data["actions"],
+                                action_repeat=int(data["action_repeat"]),
+                                outcome=outcome or None)
+
+
+class EpisodeRecorder:
+    # Wraps a SpaceMutatorsEnv and records the episode being played:
+    #   recorder = EpisodeRecorder(env)
+    #   state = recorder.reset()
+    #   ... recorder.step(action) ...
+    #   recorder.recording.save("episode.npz")
+    # reset() without a seed draws one, every recorded episode is seeded.
+
+    def __init__(self, env):
+        self.env = env
+        self.recording = None
+        self._actions = []
+        self._reward = 0.0
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2**31)
+        self._actions = []
+        self._reward = 0.0
+        self.recording = None
+        return self.env.reset(seed=seed)
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self._actions.append(action)
+        self._reward += reward
+        if done:
+            self.finish()
+        return obs, reward, done, info
+
+    def finish(self):
+        # Also called for episodes cut short (e.g. max_steps), the outcome is
+        # whatever state the game is in after the last recorded action
+        env = self.env
+        self.recording = EpisodeRecording(
+            env.seed, self._actions, action_repeat=env.action_repeat,
+            outcome=episode_outcome(env, len(self._actions), self._reward))
+        return self.recording
+
+
+def replay(recording):
+    # Re-simulates the episode headless. Returns the outcome it reached, the
+    # keys that differ from the recorded outcome and the steps per second.
+    env = SpaceMutatorsEnv(render=False, action_repeat=recording.action_repeat, seed=recording.seed)
+    step = env.step
+    total = 0.0
+    steps = 0
+    start = time.perf_counter()
+    for action in recording.actions.tolist():
+        _, reward, done, _ = step(action)
+        total += reward
+        steps += 1
+        if done:
+            break
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    outcome = episode_outcome(env, steps, total)
+    expected = recording.outcome or {}
+    mismatches = [key for key in expected if expected[key] != outcome[key]]
+    return {
+        "outcome": outcome,
+        "mismatches": mismatches,
+        "steps_per_sec": steps / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(paths):
+    failed = 0
+    for path in paths:
+        recording = EpisodeRecording.load(path)
+        result = replay(recording)
+        if result["mismatches"]:
+            failed += 1
+            diffs = ", ".join(f"{key}: recorded {recording.outcome[key]} replayed {result['outcome'][key]}"
+                              for key in result["mismatches"])
+            print(f"{path}: MISMATCH ({diffs})")
+        else:
+            print(f"{path}: ok, {len(recording)} steps, {result['steps_per_sec']:.0f} steps/sec")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
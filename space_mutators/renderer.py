@@ -0,0 +1,221 @@
+# renderer.py
+
+# Draws a GameSimulation with pygame. This is the only place the game
+# entities meet pygame surfaces, so it is imported lazily by SpaceMutatorsEnv.
+
+import time
+import numpy as np
+import pygame
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BLACK, WHITE, GREEN, RED
+from .utils import text_cache
+from .sprite_defs import load_player_image, build_enemy_image, make_bullet_image, draw_health_bar, clear_sprite_cache
+
+class SimulationRenderer:
+    # Needs a display mode to be set already (images are convert_alpha()'d)
+    def __init__(self):
+        self.player_image = load_player_image()
+        self.bullet_image = make_bullet_image()
+
+    def draw(self, surface, sim, health_bar=False):
+        player = sim.player
+        surface.blit(self.player_image, (player.x, player.y))
+
+        for enemy in sim.enemies:
+            # Tinted/scaled image comes from the shared sprite cache
+            image = build_enemy_image(enemy.sprite_index, enemy.chromosome)
+            surface.blit(image, (enemy.x, enemy.y))
+
+        for bullet in sim.bullets:
+            surface.blit(self.bullet_image, (bullet.x, bullet.y))
+
+        if health_bar:
+            draw_health_bar(surface, player)
+
+def make_heatmap_surface(heatmap):
+    # Solid red with zero alpha, draw_heatmap only rewrites the alpha plane
+    surface = pygame.Surface((heatmap.width, heatmap.height), pygame.SRCALPHA)
+    surface.fill((255, 0, 0, 0))
+    return surface
+
+def draw_heatmap(surface, heatmap):
+    # Copy the EnemyHeatmap density into the surface's alpha in place
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    np.copyto(alpha, heatmap.alpha(), casting="unsafe")
+    del alpha  # unlocks the surface
+
+class _EntitySprite(pygame.sprite.DirtySprite):
+    # Screen stand-in for one simulation body (or HUD item) in a LayeredDirty group
+    def __init__(self, layer):
+        super().__init__()
+        self._layer = layer
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.visible = 0
+
+    def show(self, image, x, y):
+        # Only marks the sprite dirty when something visible changed
+        if image is not self.image or x != self.rect.x or y != self.rect.y or not self.visible:
+            self.image = image
+            self.rect.update(x, y, image.get_width(), image.get_height())
+            self.visible = 1
+            self.dirty = 1
+
+    def hide(self):
+        if self.visible:
+            self.visible = 0
+            self.dirty = 1
+
+
+class DirtyGameRenderer:
+    # Dirty-rect drawing for game_loop's window.
+    #
+    # The game area is a LayeredDirty group of sprites that mirror the
+    # simulation bodies, so a frame only repaints where something moved.
+    # The background and the panel chrome are prebuilt once into
+    # `background`; panels are repainted by the caller every
+    # `panel_interval` frames (see panel_due/restore).
+    # present() pushes the changed rects with display.update and records
+    # how long the frame took to draw.
+
+    # Draw order, same as SimulationRenderer.draw plus the HUD on top
+    PLAYER_LAYER, ENEMY_LAYER, BULLET_LAYER, HEALTH_LAYER, HUD_LAYER = range(1, 6)
+
+    def __init__(self, screen, background, font, panel_interval=6):
+        self.screen = screen
+        self.background = background
+        self.font = font
+        self.panel_interval = max(1, panel_interval)
+        self.frame = 0
+
+        self.player_image = load_player_image()
+        self.bullet_image = make_bullet_image()
+
+        self.group = pygame.sprite.LayeredDirty()
+        self.group.clear(screen, background)
+        self.group.set_clip(pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+
+        self.player_sprite = self._new_sprite(self.PLAYER_LAYER)
+        self.health_sprite = self._new_sprite(self.HEALTH_LAYER)
+        self.enemy_sprites = []
+        self.bullet_sprites = []
+        self.hud_sprites = []
+        self._hud_texts = []
+        self._hud_images = []
+        self._health = None
+        self._health_bar = None
+
+        # Draw times of the presented frames in milliseconds, as running
+        # count/sum/max so long sessions don't grow memory
+        self.draw_count = 0
+        self.draw_total = 0.0
+        self.draw_worst = 0.0
+        self._frame_start = None
+
+        # Whole window once, after that only dirty rects
+        screen.blit(background, (0, 0))
+        pygame.display.flip()
+
+    def _new_sprite(self, layer):
+        sprite = _EntitySprite(layer)
+        self.group.add(sprite)
+        return sprite
+
+    def _sync(self, sprites, bodies, layer, image_for):
+        # Sprites are reused across frames; spare ones are only hidden
+        while len(sprites) < len(bodies):
+            sprites.append(self._new_sprite(layer))
+        for sprite, body in zip(sprites, bodies):
+            sprite.show(image_for(body), body.x, body.y)
+        for sprite in sprites[len(bodies):]:
+            sprite.hide()
+
+    def _health_image(self, player):
+        bar_length = 100
+        bar_height = 10
+        image = pygame.Surface((bar_length, bar_height))
+        image.fill(RED)
+        fill = int((player.health / player.max_health) * bar_length)
+        if fill > 0:
+            image.fill(GREEN, (0, 0, fill, bar_height))
+        return image
+
+    def draw(self, sim, hud_texts):
+        # hud_texts: list of (text, center x, center y), re-rendered only on change
+        self._frame_start = time.perf_counter()
+        player = sim.player
+
+        self.player_sprite.show(self.player_image, player.x, player.y)
+        self._sync(self.enemy_sprites, sim.enemies, self.ENEMY_LAYER,
+                   lambda enemy: build_enemy_image(enemy.sprite_index, enemy.chromosome))
+        self._sync(self.bullet_sprites, sim.bullets, self.BULLET_LAYER,
+                   lambda bullet: self.bullet_image)
+
+        # Health bar above the player, like draw_health_bar
+        if player.health != self._health:
+            self._health = player.health
+            self._health_bar = self._health_image(player)
+        self.health_sprite.show(self._health_bar, player.centerx - 50, player.top - 20)
+
+        while len(self.hud_sprites) < len(hud_texts):
+            self.hud_sprites.append(self._new_sprite(self.HUD_LAYER))
+            self._hud_texts.append(None)
+            self._hud_images.append(None)
+        for i, (text, x, y) in enumerate(hud_texts):
+            sprite = self.hud_sprites[i]
+            if text != self._hud_texts[i]:
+                self._hud_texts[i] = text
+                self._hud_images[i] = text_cache.render(self.font, text, WHITE)[0]
+            image = self._hud_images[i]
+            rect = image.get_rect(center=(x, y))
+            sprite.show(image, rect.x, rect.y)
+
+        return self.group.draw(self.screen)
+
+    def panel_due(self):
+        # True on the frames the chart/stat panels should be repainted
+        return self.frame % self.panel_interval == 0
+
+    def restore(self, rect):
+        # Paint the cached background/chrome back over `rect`
+        self.screen.blit(self.background, rect, rect)
+
+    def present(self, rects):
+        pygame.display.update(rects)
+        if self._frame_start is not None:
+            elapsed = (time.perf_counter() - self._frame_start) * 1000
+            self.draw_count += 1
+            self.draw_total += elapsed
+            if elapsed > self.draw_worst:
+                self.draw_worst = elapsed
+        self.frame += 1
+
+    def draw_time_stats(self):
+        # (average, worst) draw time in ms over all presented frames
+        if not self.draw_count:
+            return 0.0, 0.0
+        return self.draw_total / self.draw_count, self.draw_worst
+
+
+class EnvWindow:
+    # The window SpaceMutatorsEnv shows in render mode
+    def __init__(self):
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.clock = pygame.time.Clock()
+        self.renderer = SimulationRenderer()
+
+    def render(self, sim, limit_fps=True):
+        self.screen.fill(BLACK)
+        self.renderer.draw(self.screen, sim)
+        # Could also draw the player's health bar if you like
+
+        pygame.display.flip()
+        if limit_fps:
+            self.clock.tick(FPS)
+        else:
+            # Nobody else pumps events while training, keep the window responsive
+            pygame.event.pump()
+
+    def close(self):
+        clear_sprite_cache()
+        pygame.quit()
@@ -0,0 +1,459 @@
+# replay_buffer.py
+
+import os
+import json
+import numpy as np
+
+class ReplayBuffer:
+    # Fixed-capacity ring buffer of typed NumPy columns.
+    # Storage is allocated on the first push (when the state shape is known)
+    # and `cursor` is the slot the next transition overwrites.
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.cursor = 0
+        self.size = 0
+        self.rng = np.random.default_rng()
+
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+
+    def _allocate(self, state):
+        state = np.asarray(state)
+        dtype = state.dtype if state.dtype != np.float64 else np.float32
+        self.states = np.zeros((self.capacity,) + state.shape, dtype=dtype)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity,) + state.shape, dtype=dtype)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def push(self, state, action, reward, next_state, done):
+        if self.states is None:
+            self._allocate(state)
+        i = self.cursor
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.cursor = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def push_many(self, states, actions, rewards, next_states, dones):
+        # Batch version of push(), e.g. one row per game of a SpaceMutatorsVecEnv
+        states = np.asarray(states)
+        if self.states is None:
+            self._allocate(states[0])
+        n = len(states)
+        if n > self.capacity:
+            # Only the newest `capacity` transitions would survive anyway
+            keep = slice(n - self.capacity, n)
+            states, actions, rewards = states[keep], np.asarray(actions)[keep], np.asarray(rewards)[keep]
+            next_states, dones = np.asarray(next_states)[keep], np.asarray(dones)[keep]
+            n = self.capacity
+        idx = (self.cursor + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.cursor = (self.cursor + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size, out=None):
+        # Distinct indices like random.sample, gathered column by column
+        idx = self.rng.choice(self.size, batch_size, replace=False)
+        return self._gather(idx, out)
+
+    def _gather(self, idx, out=None):
+        # `out` is an optional (states, actions, rewards, next_states, dones)
+        # tuple of arrays to gather into instead of allocating new ones
+        columns = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        if out is None:
+            return tuple(column[idx] for column in columns)
+        for column, target in zip(columns, out):
+            if target.dtype == column.dtype:
+                np.take(column, idx, axis=0, out=target)
+            else:
+                target[...] = column[idx]
+        return out
+
+    def __len__(self):
+        return self.size
+
+class SumTree:
+    # Array-based binary sum-tree over `capacity` priorities.
+    # Leaves live at [tree_capacity, 2 * tree_capacity), node i has children
+    # 2i and 2i+1 and the root (index 1) holds the total priority.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.tree_capacity = 1
+        while self.tree_capacity < capacity:
+            self.tree_capacity *= 2
+        self.tree = np.zeros(2 * self.tree_capacity, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        # Batched O(k log n) update: write leaves, then recompute their ancestors
+        nodes = np.asarray(indices) + self.tree_capacity
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        # Leaf index whose cumulative-priority range contains each value, O(log n)
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.tree_capacity:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return np.minimum(nodes - self.tree_capacity, self.capacity - 1)
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices) + self.tree_capacity]
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    # Proportional prioritized replay (Schaul et al.) on top of the ring buffer.
+    # New transitions get the current max priority, sample() is stratified over
+    # the sum-tree and also returns the sampled indices and importance-sampling
+    # weights; feed TD-errors back with update_priorities().
+    def __init__(self, capacity=10000, alpha=0.6, beta_start=0.4, beta_frames=100_000, eps=1e-5):
+        super().__init__(capacity)
+        self.alpha = alpha
+        self.beta_start = beta_start
+        self.beta_frames = beta_frames
+        self.eps = eps
+        self.sample_count = 0
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    @property
+    def beta(self):
+        # Anneal beta towards 1 over beta_frames sample() calls
+        fraction = min(1.0, self.sample_count / self.beta_frames)
+        return self.beta_start + fraction * (1.0 - self.beta_start)
+
+    def push(self, state, action, reward, next_state, done):
+        i = self.cursor
+        super().push(state, action, reward, next_state, done)
+        self.tree.update([i], self.max_priority ** self.alpha)
+
+    def push_many(self, states, actions, rewards, next_states, dones):
+        start = self.cursor
+        super().push_many(states, actions, rewards, next_states, dones)
+        n = min(len(states), self.capacity)
+        idx = (start + np.arange(n)) % self.capacity
+        self.tree.update(idx, self.max_priority ** self.alpha)
+
+    def sample(self, batch_size, out=None):
+        # One draw per equal slice of the total priority
+        segment = self.tree.total() / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.get(idx) / self.tree.total()
+        weights = (self.size * probs) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        self.sample_count += 1
+
+        return self._gather(idx, out) + (idx, weights)
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+class MemmapReplayBuffer(ReplayBuffer):
+    # Ring buffer whose columns are memory-mapped .npy files in `directory`,
+    # with a small JSON header holding capacity/cursor/size. Capacity is only
+    # limited by disk, sampling reads through the page cache, and the store
+    # survives restarts: opening a directory that already holds one resumes it
+    # (the stored capacity wins over the argument).
+    # read_only=True maps an existing store read-only so several learner
+    # processes can share it; refresh() picks up what the writer flushed since.
+    HEADER = "replay.json"
+    COLUMNS = ("states", "actions", "rewards", "next_states", "dones")
+
+    def __init__(self, directory, capacity=1_000_000, read_only=False, flush_every=10_000):
+        super().__init__(capacity)
+        self.directory = directory
+        self.read_only = read_only
+        self.flush_every = flush_every
+        self._unflushed = 0
+
+        if os.path.exists(self._path(self.HEADER)):
+            self._open()
+        elif read_only:
+            raise FileNotFoundError(f"No replay store in {directory}")
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_header(self):
+        with open(self._path(self.HEADER)) as f:
+            return json.load(f)
+
+    def _write_header(self):
+        # Write-then-rename so readers never see a half written header
+        tmp_path = self._path(self.HEADER + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"capacity": self.capacity, "cursor": self.cursor, "size": self.size}, f)
+        os.replace(tmp_path, self._path(self.HEADER))
+
+    def _open(self):
+        header = self._read_header()
+        self.capacity = header["capacity"]
+        self.cursor = header["cursor"]
+        self.size = header["size"]
+        mode = "r" if self.read_only else "r+"
+        for name in self.COLUMNS:
+            setattr(self, name, np.load(self._path(name + ".npy"), mmap_mode=mode))
+
+    def _allocate(self, state):
+        state = np.asarray(state)
+        dtype = state.dtype if state.dtype != np.float64 else np.float32
+        shapes = {
+            "states": ((self.capacity,) + state.shape, dtype),
+            "actions": ((self.capacity,), np.int64),
+            "rewards": ((self.capacity,), np.float32),
+            "next_states": ((self.capacity,) + state.shape, dtype),
+            "dones": ((self.capacity,), bool),
+        }
+        for name in self.COLUMNS:
+            shape, column_dtype = shapes[name]
+            column = np.lib.format.open_memmap(self._path(name + ".npy"), mode="w+",
+                                               dtype=column_dtype, shape=shape)
+            setattr(self, name, column)
+        self._write_header()
+
+    def push(self, state, action, reward, next_state, done):
+        if self.read_only:
+            raise PermissionError("Replay store was opened read-only")
+        super().push(state, action, reward, next_state, done)
+        self._wrote(1)
+
+    def push_many(self, states, actions, rewards, next_states, dones):
+        if self.read_only:
+            raise PermissionError("Replay store was opened read-only")
+        super().push_many(states, actions, rewards, next_states, dones)
+        self._wrote(len(states))
+
+    def _wrote(self, n):
+        self._unflushed += n
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        # Data first, then the header, so the header never points past written rows
+        if self.read_only or self.states is None:
+            return
+        for name in self.COLUMNS:
+            getattr(self, name).flush()
+        self._write_header()
+        self._unflushed = 0
+
+    def refresh(self):
+        # Re-read cursor/size written by another process
+        if self.states is None and os.path.exists(self._path(self.HEADER)):
+            self._open()
+            return
+        header = self._read_header()
+        self.cursor = header["cursor"]
+        self.size = header["size"]
+
+    def close(self):
+        self.flush()
+        for name in self.COLUMNS:
+            setattr(self, name, None)
+
+class FrameReplayBuffer:
+    # Replay for stacked frame observations, (frame_stack, H, W) states.
+    # Every frame is stored once in a ring; a transition only keeps the
+    # (absolute) indices of the newest frame of its state and next_state and
+    # the stacks are rebuilt at sample time. A transition also keeps the
+    # (absolute) first frame of its episode: stack slots before that repeat
+    # the first frame, which is exactly what the env's reset stack looks like.
+    # Nothing is read from ring slots that may have been reused since.
+    #
+    # next_state must be `state` shifted by one frame, as the env's stack is.
+    # push() checks whether `state` continues the previous push. If it does
+    # only next_state's newest frame is new; otherwise (new episode, truncated
+    # game, unrelated transition) the frames of `state` start a new segment.
+    # Transitions whose frames were overwritten by the frame ring are dropped
+    # from the old end, so a few of the `capacity` slots are lost per episode.
+    def __init__(self, capacity=10000, frame_stack=4, frame_capacity=None):
+        self.capacity = capacity
+        self.frame_stack = frame_stack
+        # One frame per transition plus the extra frames at episode starts
+        self.frame_capacity = frame_capacity or capacity + 4 * frame_stack
+        self.rng = np.random.default_rng()
+
+        self.frames = None
+        self.frame_count = 0  # absolute index of the next frame
+
+        self.state_refs = np.zeros(capacity, dtype=np.int64)
+        self.next_refs = np.zeros(capacity, dtype=np.int64)
+        self.episode_starts = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.cursor = 0
+        self.size = 0
+
+        self._last_ref = None  # newest frame of the previous next_state
+        self._last_start = None  # and the first frame of its episode
+        self._offsets = np.arange(-(frame_stack - 1), 1)
+
+    def _add_frame(self, frame):
+        n = self.frame_count
+        self.frames[n % self.frame_capacity] = frame
+        self.frame_count = n + 1
+        return n
+
+    def _stack_positions(self, refs, starts):
+        # (len(refs), frame_stack) ring positions of the stacks ending at refs
+        # in episodes whose first frame is starts
+        refs = np.asarray(refs)
+        absolute = np.maximum(refs[..., None] + self._offsets, np.asarray(starts)[..., None])
+        return absolute % self.frame_capacity
+
+    def _continues(self, state):
+        if self._last_ref is None:
+            return False
+        if self.frame_count - self._last_ref + self.frame_stack > self.frame_capacity:
+            return False
+        return np.array_equal(self.frames[self._stack_positions(self._last_ref, self._last_start)], state)
+
+    def push(self, state, action, reward, next_state, done):
+        state = np.asarray(state)
+        next_state = np.asarray(next_state)
+        if self.frames is None:
+            self.frames = np.zeros((self.frame_capacity,) + state.shape[1:], dtype=state.dtype)
+
+        if self._continues(state):
+            state_ref = self._last_ref
+            start = self._last_start
+        else:
+            # Leading copies of the first frame come back from the episode start
+            first = 0
+            while first + 1 < len(state) and np.array_equal(state[first + 1], state[0]):
+                first += 1
+            start = self.frame_count
+            for frame in state[first:]:
+                state_ref = self._add_frame(frame)
+        next_ref = self._add_frame(next_state[-1])
+
+        i = self.cursor
+        self.state_refs[i] = state_ref
+        self.next_refs[i] = next_ref
+        self.episode_starts[i] = start
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.cursor = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self._last_ref = None if done else next_ref
+        self._last_start = start
+        self._drop_overwritten()
+
+    def push_many(self, states, actions, rewards, next_states, dones):
+        for transition in zip(states, actions, rewards, next_states, dones):
+            self.push(*transition)
+
+    def _drop_overwritten(self):
+        # Oldest transitions whose oldest frame is no longer in the ring
+        # (next_state only adds a newer frame, so checking state is enough)
+        oldest_kept = self.frame_count - self.frame_capacity
+        while self.size:
+            i = (self.cursor - self.size) % self.capacity
+            first = max(self.state_refs[i] - self.frame_stack + 1, self.episode_starts[i])
+            if first >= oldest_kept:
+                break
+            self.size -= 1
+
+    def sample(self, batch_size, out=None):
+        idx = (self.cursor - self.size + self.rng.choice(self.size, batch_size, replace=False)) % self.capacity
+        return self._gather(idx, out)
+
+    def transitions(self):
+        # Every kept transition, oldest first, with the stacks rebuilt as sample() does
+        return self._gather((self.cursor - self.size + np.arange(self.size)) % self.capacity)
+
+    def _gather(self, idx, out=None):
+        starts = self.episode_starts[idx]
+        state_pos = self._stack_positions(self.state_refs[idx], starts)
+        next_pos = self._stack_positions(self.next_refs[idx], starts)
+        if out is None:
+            return (self.frames[state_pos], self.actions[idx], self.rewards[idx],
+                    self.frames[next_pos], self.dones[idx])
+        states, actions, rewards, next_states, dones = out
+        np.take(self.frames, state_pos, axis=0, out=states)
+        np.take(self.actions, idx, out=actions)
+        np.take(self.rewards, idx, out=rewards)
+        np.take(self.frames, next_pos, axis=0, out=next_states)
+        np.take(self.dones, idx, out=dones)
+        return out
+
+    def nbytes(self):
+        frames = self.frames.nbytes if self.frames is not None else 0
+        return (frames + self.episode_starts.nbytes + self.state_refs.nbytes + self.next_refs.nbytes
+                + self.actions.nbytes + self.rewards.nbytes + self.dones.nbytes)
+
+    def __len__(self):
+        return self.size
+
+
+def check_frame_replay(capacity=50, frame_stack=4, episodes=2_000, frame_capacity=None, seed=0):
+    # Self-check of FrameReplayBuffer's bookkeeping: plays env-like episodes
+    # of 1-7 steps through a small buffer so the frame ring wraps many times.
+    # Every frame is filled with its own id and the reward holds the
+    # transition number, so each kept transition can be compared with the
+    # stacks that were pushed. Raises AssertionError on the first mismatch.
+    #   python -m space_mutators.replay_buffer
+    rng = np.random.default_rng(seed)
+    buffer = FrameReplayBuffer(capacity, frame_stack, frame_capacity)
+    pushed = []
+    frame_id = 0
+
+    def frames(ids):
+        return np.asarray(ids, dtype=np.int64)[:, None, None] * np.ones((1, 2, 2), dtype=np.int64)
+
+    for _ in range(episodes):
+        frame_id += 1
+        stack = [frame_id] * frame_stack  # reset stack: the first frame repeated
+        steps = rng.integers(1, 8)
+        for step in range(steps):
+            frame_id += 1
+            next_stack = stack[1:] + [frame_id]
+            buffer.push(frames(stack), 0, len(pushed), frames(next_stack), step == steps - 1)
+            pushed.append((stack, next_stack))
+            stack = next_stack
+
+    states, _, rewards, next_states, _ = buffer.transitions()
+    for state, transition, next_state in zip(states[:, :, 0, 0].tolist(), rewards.astype(np.int64).tolist(),
+                                             next_states[:, :, 0, 0].tolist()):
+        expected_state, expected_next = pushed[transition]
+        if state != expected_state or next_state != expected_next:
+            raise AssertionError(f"FrameReplayBuffer transition {transition} rebuilt as "
+                                 f"{state} -> {next_state}, pushed {expected_state} -> {expected_next}")
+    return len(buffer)
+
+
+if __name__ == "__main__":
+    # Tight frame ring (4 spare frames), then the default ring size
+    for frame_capacity in (54, None):
+        kept = check_frame_replay(frame_capacity=frame_capacity)
+        print(f"FrameReplayBuffer ok (frame_capacity={frame_capacity or 'default'}, {kept} transitions kept)")
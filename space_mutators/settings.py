@@ -19,6 +19,9 @@ HEATMAP_WIDTH = 300
 # The total screen width for the entire window
 TOTAL_WIDTH = SCREEN_WIDTH + CHART_WIDTH + HEATMAP_WIDTH
 
+# Charts, stats and heatmap are repainted every N frames (the game area every frame)
+PANEL_REFRESH_INTERVAL = 6
+
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "..", "assets")
 PLAYER_SPRITE = os.path.join(ASSETS_DIR, "player.png")
 ENEMY_SPRITES = [
@@ -0,0 +1,391 @@
+# simulation.py
+
+# Display-free game state shared by SpaceMutatorsEnv and game_loop.
+# Entities are plain rect/velocity records, nothing here touches pygame,
+# so headless training never has to initialise SDL or decode images.
+# Drawing lives in renderer.py.
+
+import math
+import random
+import struct
+import numpy as np
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_SPRITE, ENEMY_SPRITES
+from .chromosome import EnemyChromosome, GENES
+from .collision import SpatialGrid
+from .entity_obs import enemy_table, bullet_table
+
+PLAYER_SPEED = 7
+PLAYER_MAX_HEALTH = 100
+BULLET_WIDTH = 4
+BULLET_HEIGHT = 10
+BULLET_SPEED = 10
+# Below this many enemy x bullet pairs collide_bullets skips the spatial grid
+GRID_MIN_PAIRS = 256
+
+
+def png_size(path):
+    # Read width/height straight from the PNG header, no need to decode the image
+    with open(path, "rb") as f:
+        header = f.read(24)
+    width, height = struct.unpack(">II", header[16:24])
+    return width, height
+
+
+PLAYER_SIZE = png_size(PLAYER_SPRITE)
+ENEMY_SIZES = [png_size(path) for path in ENEMY_SPRITES]
+
+
+def rect_round(value):
+    # pygame.Rect stores ints and rounds half away from zero when given floats
+    return int(value + math.copysign(0.5, value))
+
+
+class Body:
+    # A pygame.Rect-like record: integer position and size plus an alive flag
+
+    __slots__ = ("x", "y", "w", "h", "alive")
+
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.alive = True
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.w
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.h
+
+    @property
+    def centerx(self):
+        return self.x + self.w // 2
+
+    @property
+    def centery(self):
+        return self.y + self.h // 2
+
+    def move(self, dx, dy):
+        # Same as rect.x += dx; rect.y += dy
+        self.x = rect_round(self.x + dx)
+        self.y = rect_round(self.y + dy)
+
+    def colliderect(self, other):
+        return (self.x < other.x + other.w and self.x + self.w > other.x and
+                self.y < other.y + other.h and self.y + self.h > other.y)
+
+
+class PlayerBody(Body):
+
+    __slots__ = ("speed", "health", "max_health")
+
+    def __init__(self):
+        w, h = PLAYER_SIZE
+        super().__init__(SCREEN_WIDTH // 2 - w // 2, SCREEN_HEIGHT - 10 - h, w, h)
+        self.speed = PLAYER_SPEED
+        self.health = PLAYER_MAX_HEALTH
+        self.max_health = PLAYER_MAX_HEALTH
+
+
+class EnemyBody(Body):
+
+    __slots__ = ("sprite_index", "chromosome", "dx", "dy", "health", "slot")
+
+    def __init__(self, level, chromosome=None, rng=None):
+        self.reset(level, chromosome, rng)
+
+    def reset(self, level, chromosome=None, rng=None):
+        # (Re)initialise in place, used by BodyPool to recycle dead enemies
+        if rng is None:
+            rng = random
+        sprite_index = rng.randint(0, len(ENEMY_SPRITES) - 1)
+
+        # Assign or create a chromosome
+        if chromosome is None:
+            chromosome = EnemyChromosome(rng=rng)
+
+        # Size follows sprite_scale_gene, like the scaled sprite image
+        base_w, base_h = ENEMY_SIZES[sprite_index]
+        w = base_w * chromosome.sprite_scale_gene // 100
+        h = base_h * chromosome.sprite_scale_gene // 100
+        x = rng.randint(50, SCREEN_WIDTH - 50 - w)
+        y = rng.randint(-100, -40)
+        Body.__init__(self, x, y, w, h)
+
+        self.sprite_index = sprite_index
+        self.chromosome = chromosome
+
+        # Track x and y velocity separately
+        self.dx = rng.choice([-1, 1]) * (rng.randint(1, 2) + level)
+        self.dy = chromosome.speed_gene + level/4
+
+        # For health, we can start with base 20, multiplied by health_gene
+        self.health = 20 * chromosome.health_gene
+
+    def update(self):
+        # Move according to velocities
+        self.move(self.dx, self.dy)
+
+        # Bounce horizontally
+        if self.x < 0:
+            self.x = 0
+            self.dx = -self.dx  # reverse direction
+        elif self.right > SCREEN_WIDTH:
+            self.x = SCREEN_WIDTH - self.w
+            self.dx = -self.dx
+
+        # Award some "travel fitness" for each update tick it stays alive
+        self.chromosome.add_fitness(self.dy)
+
+
+class BulletBody(Body):
+
+    __slots__ = ("speed", "slot")
+
+    def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        # Centered on (x, y) like the old Bullet sprite
+        Body.__init__(self, x - BULLET_WIDTH // 2, y - BULLET_HEIGHT // 2, BULLET_WIDTH, BULLET_HEIGHT)
+        self.speed = BULLET_SPEED
+
+    def update(self):
+        self.y -= self.speed
+        if self.bottom < 0:
+            self.alive = False
+
+
+class BodyPool:
+    # Free list of dead bodies of one class. acquire() reinitialises a recycled
+    # body with body.reset(*args) and only allocates when the list is empty,
+    # so steady-state spawning and shooting allocate nothing.
+
+    def __init__(self, body_class):
+        self.body_class = body_class
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, *args):
+        if self.free:
+            body = self.free.pop()
+            body.reset(*args)
+            self.hits += 1
+        else:
+            body = self.body_class(*args)
+            self.misses += 1
+        return body
+
+    def release(self, body):
+        # Dead bodies keep their fields until reused, so callers can still read
+        # the enemies returned by the collision checks
+        body.alive = False
+        self.free.append(body)
+
+    def release_all(self, bodies):
+        for body in bodies:
+            body.alive = False
+        self.free.extend(bodies)
+
+    def stats(self):
+        acquired = self.hits + self.misses
+        return {
+            "allocated": self.misses,
+            "free": len(self.free),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / acquired if acquired else 0.0,
+        }
+
+
+class GameSimulation:
+    # Player, enemies and bullets of one game plus the rules that move them.
+    # SpaceMutatorsEnv and game_loop call these pieces in their own order.
+    # track_entities=True also mirrors enemies/bullets into NumPy tables
+    # (see entity_obs.py), every body then carries its table slot.
+    # rng is the random.Random stream enemies are drawn from (default: the
+    # global random module); swap it with sim.rng to reseed a game.
+
+    def __init__(self, spawn_interval=80, max_levels=10, max_escaped=10, track_entities=False,
+                 rng=None):
+        self.spawn_interval = spawn_interval
+        self.max_levels = max_levels
+        self.max_escaped = max_escaped
+        self.rng = rng if rng is not None else random
+        # Broad phase for bullet/enemy collisions, rebuilt every check
+        self.bullet_grid = SpatialGrid()
+        # Dead enemies/bullets are recycled instead of garbage collected
+        self.enemy_pool = BodyPool(EnemyBody)
+        self.bullet_pool = BodyPool(BulletBody)
+        self.enemy_table = enemy_table() if track_entities else None
+        self.bullet_table = bullet_table() if track_entities else None
+        self.enemies = []
+        self.bullets = []
+        self.reset()
+
+    def reset(self):
+        self.player = PlayerBody()
+        self.enemy_pool.release_all(self.enemies)
+        self.bullet_pool.release_all(self.bullets)
+        self.enemies = []
+        self.bullets = []
+        if self.enemy_table is not None:
+            self.enemy_table.clear()
+            self.bullet_table.clear()
+        self.score = 0
+        self.escaped_enemies = 0
+        self.level = 1
+        self.spawn_timer = 0
+
+    def tick_spawn_timer(self):
+        # True every spawn_interval ticks
+        self.spawn_timer += 1
+        if self.spawn_timer >= self.spawn_interval:
+            self.spawn_timer = 0
+            return True
+        return False
+
+    def spawn_enemy(self, chromosome=None):
+        enemy = self.enemy_pool.acquire(self.level, chromosome, self.rng)
+        self.enemies.append(enemy)
+        table = self.enemy_table
+        if table is not None:
+            slot = enemy.slot = table.add()
+            chromosome = enemy.chromosome
+            table.x[slot] = enemy.x
+            table.y[slot] = enemy.y
+            table.half_w[slot] = enemy.w // 2
+            table.half_h[slot] = enemy.h // 2
+            table.dx[slot] = enemy.dx
+            table.dy[slot] = enemy.dy
+            table.genes[slot] = [getattr(chromosome, gene) for gene in GENES]
+        return enemy
+
+    def shoot(self):
+        bullet = self.bullet_pool.acquire(self.player.centerx, self.player.top)
+        self.bullets.append(bullet)
+        table = self.bullet_table
+        if table is not None:
+            slot = bullet.slot = table.add()
+            table.cx[slot] = bullet.centerx
+            table.cy[slot] = bullet.centery
+        return bullet
+
+    def apply_action(self, action):
+        # Agent actions: 0 none, 1 left, 2 right, 3 shoot
+        player = self.player
+        if action == 1:  # left
+            player.x -= player.speed
+        elif action == 2:  # right
+            player.x += player.speed
+        elif action == 3:  # shoot
+            self.shoot()
+
+        # Bound the player inside the screen
+        if player.x < 0:
+            player.x = 0
+        if player.right > SCREEN_WIDTH:
+            player.x = SCREEN_WIDTH - player.w
+
+    def update_enemies(self):
+        table = self.enemy_table
+        if table is None:
+            for enemy in self.enemies:
+                enemy.update()
+            return
+        # Rows are written in the same pass that moves the enemies
+        xs, ys, dxs = table.x, table.y, table.dx
+        for enemy in self.enemies:
+            enemy.update()
+            slot = enemy.slot
+            xs[slot] = enemy.x
+            ys[slot] = enemy.y
+            dxs[slot] = enemy.dx
+
+    def update_bullets(self):
+        for bullet in self.bullets:
+            bullet.update()
+        table = self.bullet_table
+        if table is not None:
+            # Every bullet flies straight up at the same speed
+            np.subtract(table.cy, BULLET_SPEED, out=table.cy, where=table.alive)
+        self._remove_dead_bullets()
+
+    def remove_escaped(self):
+        # Enemies that went off-screen at the bottom
+        escaped = [enemy for enemy in self.enemies if enemy.top > SCREEN_HEIGHT]
+        if escaped:
+            self.escaped_enemies += len(escaped)
+            self._kill_enemies(escaped)
+        return escaped
+
+    def collide_bullets(self):
+        # Same kill sets as pygame.sprite.groupcollide(enemies, bullets, True, True):
+        # enemies are checked in spawn order and a bullet only counts once.
+        # Only bullets in the grid cells an enemy covers are tested.
+        hit = []
+        if not self.enemies or not self.bullets:
+            return hit
+        if len(self.enemies) * len(self.bullets) <= GRID_MIN_PAIRS:
+            # Too few pairs for the grid to pay off
+            candidates = lambda enemy: self.bullets
+        else:
+            self.bullet_grid.build(self.bullets)
+            candidates = self.bullet_grid.query
+        for enemy in self.enemies:
+            struck = [bullet for bullet in candidates(enemy) if bullet.alive and enemy.colliderect(bullet)]
+            if struck:
+                hit.append(enemy)
+                for bullet in struck:
+                    bullet.alive = False
+        if hit:
+            self.score += len(hit)
+            self._kill_enemies(hit)
+            self._remove_dead_bullets()
+        return hit
+
+    def collide_player(self):
+        # Same as pygame.sprite.spritecollide(player, enemies, True)
+        player = self.player
+        touching = [enemy for enemy in self.enemies if enemy.colliderect(player)]
+        if touching:
+            player.health -= 20 * len(touching)
+            self._kill_enemies(touching)
+        return touching
+
+    def check_level(self):
+        if self.score >= 20 * self.level and self.level < self.max_levels:
+            self.level += 1
+
+    def pool_stats(self):
+        return {"enemies": self.enemy_pool.stats(), "bullets": self.bullet_pool.stats()}
+
+    def _kill_enemies(self, dead):
+        if self.enemy_table is not None:
+            for enemy in dead:
+                self.enemy_table.remove(enemy.slot)
+        self.enemy_pool.release_all(dead)
+        self.enemies = [enemy for enemy in self.enemies if enemy.alive]
+
+    def _remove_dead_bullets(self):
+        bullets = self.bullets
+        alive = [bullet for bullet in bullets if bullet.alive]
+        if len(alive) != len(bullets):
+            dead = [bullet for bullet in bullets if not bullet.alive]
+            if self.bullet_table is not None:
+                for bullet in dead:
+                    self.bullet_table.remove(bullet.slot)
+            self.bullet_pool.release_all(dead)
+            self.bullets = alive
@@ -1,13 +1,12 @@
 # space_mutators_env.py
 
-import pygame
-import sys
-import math
+import time
 import random
 import numpy as np
-from pygame.locals import *
 from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
-from .sprite_defs import Player, Enemy, Bullet, EnemyChromosome
+from .simulation import GameSimulation
+from .chromosome import EnemyChromosome
+from .entity_obs import EntityObserver
 
 # Actions the agent can take
 # We'll define a simple discrete action space:
@@ -18,79 +17,137 @@ from .sprite_defs import Player, Enemy, Bullet, EnemyChromosome
 
 ACTIONS = {0: "NONE", 1: "LEFT", 2: "RIGHT", 3: "SHOOT"}
 
+def observe(sim):
+    # The 7-float observation of a GameSimulation (also used by headless players)
+    player_x = sim.player.centerx / float(SCREEN_WIDTH)
+    player_health = sim.player.health / 100.0
+
+    # Just count # of enemies
+    num_enemies = len(sim.enemies)
+    # maybe average enemy y
+    avg_enemy_y = 0.0
+    if num_enemies > 0:
+        avg_enemy_y = sum(e.centery for e in sim.enemies) / (num_enemies * SCREEN_HEIGHT)
+    # bullets
+    num_bullets = len(sim.bullets)
+
+    obs = np.array([
+        player_x, 
+        player_health,
+        num_enemies, 
+        avg_enemy_y,
+        num_bullets,
+        sim.score,
+        sim.escaped_enemies
+    ], dtype=np.float32)
+
+    return obs
+
 class SpaceMutatorsEnv:
-    def __init__(self, render=False):
+    # action_repeat=k plays every action for k simulation ticks: rewards are
+    # summed, the episode ends as soon as any tick ends it, and only the last
+    # tick builds an observation.
+    # With render=True the window is redrawn on its own wall-clock schedule
+    # (render_fps frames per second) and stepping is never slowed down.
+    # realtime=True instead draws every tick and waits for the 60 FPS clock,
+    # for watching a game at normal speed.
+    # obs_mode="pixels" returns a (frame_stack, frame_size, frame_size) uint8
+    # stack of grayscale playfield frames instead of the 7-float vector.
+    # obs_mode="entities" appends the k_enemies nearest enemies and k_bullets
+    # nearest bullets (padded, with masks) to the 7 floats, see entity_obs.py.
+    # seed gives the env its own random.Random stream (reset(seed=...) restarts
+    # it), so the same seed and actions replay the same episode; without a seed
+    # the global random module is used as before.
+    # heatmap: an EnemyHeatmap that counts enemy positions every simulation
+    # tick (so action_repeat doesn't thin it out), e.g. EnemyHeatmap(display=False).
+    def __init__(self, render=False, action_repeat=1, render_fps=FPS, realtime=False,
+                 obs_mode="vector", frame_size=64, frame_stack=4, k_enemies=8, k_bullets=4,
+                 seed=None, heatmap=None):
 
         self.render_mode = render
-        self.clock = None
-        self.screen = None
-
-        # To handle no-render mode, we can optionally not create a visible display:
+        self.window = None
+        self.action_repeat = action_repeat
+        self.realtime = realtime
+        self.render_interval = 1.0 / render_fps
+        self._next_render = 0.0
+        self.heatmap = heatmap
+
+        # Headless runs never touch pygame, only a visible window needs it
         if self.render_mode:
-            pygame.init()
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-            self.clock = pygame.time.Clock()
-        else:
-            # Headless:
-            pygame.display.init()
-            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        
-        # Basic environment settings
-        self.spawn_interval = 80
-        self.spawn_timer = 0
-        self.level = 1
-        self.max_levels = 10
+            from .renderer import EnvWindow
+            self.window = EnvWindow()
+
+        if obs_mode not in ("vector", "pixels", "entities"):
+            raise ValueError(f"Unknown obs_mode {obs_mode!r}, use 'vector', 'pixels' or 'entities'")
+        self.obs_mode = obs_mode
+        self.pixels = None
+        if obs_mode == "pixels":
+            from .pixels import PixelObserver
+            self.pixels = PixelObserver(frame_size=frame_size, frame_stack=frame_stack)
+        self.entities = None
+        if obs_mode == "entities":
+            self.entities = EntityObserver(k_enemies=k_enemies, k_bullets=k_bullets)
+
+        # Basic environment settings (player, enemies, bullets, score, level...)
+        self.seed = None
+        self.rng = random
+        self.sim = GameSimulation(spawn_interval=80, max_levels=10, max_escaped=10,
+                                  track_entities=self.entities is not None, rng=self.rng)
 
         self._prev_player_x = None
 
-        self.reset()
+        self.reset(seed=seed)
 
-    def reset(self):
+    def reset(self, seed=None):
 
-        # If we had multiple levels or waves, we'd reset them here
-        self.score = 0
-        self.escaped_enemies = 0
-        self.max_escaped = 10
+        # A new seed restarts the env's own stream
+        if seed is not None:
+            self.seed = seed
+            self.rng = self.sim.rng = random.Random(seed)
 
-        # Pygame groups
-        self.player = Player()
-        self.all_sprites = pygame.sprite.Group(self.player)
-        self.enemies = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
-
-        self._prev_player_x = self.player.rect.centerx
-        self.done = False
-        return self._get_observation()
-
-        # Timer
-        self.spawn_timer = 0
+        # Fresh player, no enemies/bullets, score/level/spawn timer back to start
+        self.sim.reset()
+        self._prev_player_x = self.sim.player.centerx
 
         # The agent's done condition
         self.done = False
 
-        # Return the observation vector
+        # Return the observation vector (or a fresh frame stack)
+        if self.pixels is not None:
+            return self.pixels.reset(self.sim).copy()
         return self._get_observation()
 
     def _spawn_enemy(self):
         # We won't do genetic breeding here, just random enemies for now:
-        enemy = Enemy(self.level, chromosome=EnemyChromosome())
-        self.all_sprites.add(enemy)
-        self.enemies.add(enemy)
+        self.sim.spawn_enemy(chromosome=EnemyChromosome(rng=self.rng))
 
     def step(self, action):
 
+        # Repeat the action for action_repeat ticks (stops early once done)
+        reward = 0.0
+        for _ in range(self.action_repeat):
+            reward += self._tick(action)
+            if self.done:
+                break
+
+        # 5) Return next obs, reward, done, info
+        obs = self._get_observation()
+        return obs, reward, self.done, {}
+
+    def _tick(self, action):
+
         # 1) Process action
         reward = 0.0
         self._handle_action(action)
 
         # 2) Spawn enemies periodically
-        self.spawn_timer += 1
-        if self.spawn_timer >= self.spawn_interval:
-            self.spawn_timer = 0
+        if self.sim.tick_spawn_timer():
             self._spawn_enemy()
 
         # 3) Update logic
         self._update()
+        if self.heatmap is not None:
+            self.heatmap.accumulate(self.sim.enemies)
 
         # 4) Calculate reward
         # We do some partial shaping:
@@ -100,69 +157,48 @@ class SpaceMutatorsEnv:
         # For more advanced shaping, see collisions logic in _update()
         reward += self._calculate_reward()
 
-        # 5) Return next obs, reward, done, info
-        obs = self._get_observation()
-        return obs, reward, self.done, {}
+        # Optionally do a render if in render_mode
+        if self.render_mode:
+            self._render()
+
+        return reward
 
     def _handle_action(self, action):
 
-        if action == 1:  # left
-            self.player.rect.x -= self.player.speed
-        elif action == 2:  # right
-            self.player.rect.x += self.player.speed
-        elif action == 3:  # shoot
-            bullet = Bullet(self.player.rect.centerx, self.player.rect.top)
-            self.all_sprites.add(bullet)
-            self.bullets.add(bullet)
-        
-        # Bound the player inside the screen
-        if self.player.rect.x < 0:
-            self.player.rect.x = 0
-        if self.player.rect.right > SCREEN_WIDTH:
-            self.player.rect.right = SCREEN_WIDTH
+        # Move/shoot and keep the player inside the screen
+        self.sim.apply_action(action)
 
     def _update(self):
 
+        sim = self.sim
+
         # Update enemies and bullets
-        self.enemies.update()
-        self.bullets.update()
+        sim.update_enemies()
+        sim.update_bullets()
 
         # If an enemy goes off-screen at bottom:
-        for enemy in self.enemies.copy():
-            if enemy.rect.top > SCREEN_HEIGHT:
-                self.escaped_enemies += 1
-                enemy.kill()
-                # We can check if that leads to done
-                if self.escaped_enemies >= self.max_escaped:
-                    self.done = True
-
-        # Bullet-enemy collisions
-        collisions = pygame.sprite.groupcollide(self.enemies, self.bullets, True, True)
-        for enemy in collisions.keys():
-            self.score += 1
-        
-        # Enemy-player collisions
-        collided_enemies = pygame.sprite.spritecollide(self.player, self.enemies, True)
-        for enemy in collided_enemies:
-            self.player.health -= 20
-            if self.player.health <= 0:
+        if sim.remove_escaped():
+            # We can check if that leads to done
+            if sim.escaped_enemies >= sim.max_escaped:
                 self.done = True
 
+        # Bullet-enemy collisions (score is counted by the simulation)
+        sim.collide_bullets()
+
+        # Enemy-player collisions
+        if sim.collide_player() and sim.player.health <= 0:
+            self.done = True
+
         # Check leveling
-        if self.score >= 20 * self.level and self.level < self.max_levels:
-            self.level += 1
-        if self.level > self.max_levels:
+        sim.check_level()
+        if sim.level > sim.max_levels:
             # The player "wins" or we've passed the final wave
             self.done = True
 
-        # Optionally do a render if in render_mode
-        if self.render_mode:
-            self._render()
-
     def _calculate_reward(self):
         reward = 0.0
 
-        current_x = self.player.rect.centerx
+        current_x = self.sim.player.centerx
         movement = abs(current_x - self._prev_player_x)
 
         # For each point in score, let's give +1 total
@@ -176,9 +212,9 @@ class SpaceMutatorsEnv:
         # This is somewhat arbitrary, you'll want to refine.
 
         # Example:
-        reward += 10.00 * self.score
+        reward += 10.00 * self.sim.score
         #reward -= 0.01
-        reward -= 2.0 * self.escaped_enemies
+        reward -= 2.0 * self.sim.escaped_enemies
 
         #Adding Reward on Movement
         #reward += 0.001 * movement
@@ -201,39 +237,29 @@ class SpaceMutatorsEnv:
 
     def _render(self):
 
-        self.screen.fill((0,0,0))
-        self.all_sprites.draw(self.screen)
-        # Could also draw the player's health bar if you like
+        if self.realtime:
+            self.window.render(self.sim)
+            return
 
-        pygame.display.flip()
-        self.clock.tick(FPS)
+        # Fixed wall-clock timestep: draw when the next frame is due and let
+        # the simulation run freely in between
+        now = time.perf_counter()
+        if now >= self._next_render:
+            self.window.render(self.sim, limit_fps=False)
+            self._next_render += self.render_interval
+            if self._next_render < now:
+                # Fell behind (slow frame), don't try to catch up
+                self._next_render = now + self.render_interval
 
     def _get_observation(self):
-
-        player_x = self.player.rect.centerx / float(SCREEN_WIDTH)
-        player_health = self.player.health / 100.0
-
-        # Just count # of enemies
-        num_enemies = len(self.enemies)
-        # maybe average enemy y
-        avg_enemy_y = 0.0
-        if num_enemies > 0:
-            avg_enemy_y = sum(e.rect.centery for e in self.enemies) / (num_enemies * SCREEN_HEIGHT)
-        # bullets
-        num_bullets = len(self.bullets)
-
-        obs = np.array([
-            player_x, 
-            player_health,
-            num_enemies, 
-            avg_enemy_y,
-            num_bullets,
-            self.score,
-            self.escaped_enemies
-        ], dtype=np.float32)
-
-        return obs
+        if self.pixels is not None:
+            # The stack is a view into the observer's ring, callers keep states
+            # across steps so hand out a copy (16 KB at the default size)
+            return self.pixels.observe(self.sim).copy()
+        if self.entities is not None:
+            return self.entities.encode(self.sim).copy()
+        return observe(self.sim)
 
     def close(self):
         if self.render_mode:
-            pygame.quit()
+            self.window.close()
@@ -1,159 +1,68 @@
 import pygame
-import random
-from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, GREEN, RED, PLAYER_SPRITE, ENEMY_SPRITES
-
-class EnemyChromosome:
-
-    # A container for enemy 'genes' plus logic for mutation, crossover, fitness, etc.
-
-    def __init__(
-        self,
-        speed_gene=None,
-        health_gene=None,
-        bullet_speed_gene=None,
-        sprite_scale_gene=None,
-        color_tint_gene=None
-    ):
-
-        self.speed_gene = speed_gene if speed_gene is not None else random.randint(1, 2)
-        self.health_gene = health_gene if health_gene is not None else random.randint(1, 3)
-        self.bullet_speed_gene = bullet_speed_gene if bullet_speed_gene is not None else random.randint(5, 12)
-        self.sprite_scale_gene = sprite_scale_gene if sprite_scale_gene is not None else random.randint(80, 150)
-        self.color_tint_gene = color_tint_gene if color_tint_gene is not None else random.randint(0, 255)
-
-        # Track how "successful" or "fit" the enemy was
-        self.fitness = 0
-
-    def mutate(self, mutation_rate=0.1):
-
-        if random.random() < mutation_rate:
-            self.speed_gene = max(1, self.speed_gene + random.choice([-1, 1]))
-        if random.random() < mutation_rate:
-            self.health_gene = max(1, self.health_gene + random.choice([-1, 1]))
-        if random.random() < mutation_rate:
-            self.bullet_speed_gene = max(1, self.bullet_speed_gene + random.choice([-2, -1, 1, 2]))
-        if random.random() < mutation_rate:
-            #sprite_scale_gene in [10..200] to avoid extremes
-            self.sprite_scale_gene = max(150, min(80, self.sprite_scale_gene + random.choice([-10, -5, 5, 10])))
-        if random.random() < mutation_rate:
-            # color_tint_gene in [0..255]
-            shift = random.randint(-30, 30)
-            self.color_tint_gene = min(255, max(0, self.color_tint_gene + shift))
-
-    @staticmethod
-    def crossover(parentA, parentB):
-
-        child = EnemyChromosome(
-            speed_gene = parentA.speed_gene if random.random() < 0.5 else parentB.speed_gene,
-            health_gene = parentA.health_gene if random.random() < 0.5 else parentB.health_gene,
-            bullet_speed_gene = parentA.bullet_speed_gene if random.random() < 0.5 else parentB.bullet_speed_gene,
-            sprite_scale_gene = parentA.sprite_scale_gene if random.random() < 0.5 else parentB.sprite_scale_gene,
-            color_tint_gene = parentA.color_tint_gene if random.random() < 0.5 else parentB.color_tint_gene
-        )
-        return child
-
-    def add_fitness(self, amount):
-
-        self.fitness += amount
-
-    def __repr__(self):
-        return (f"<EnemyChromosome speed={self.speed_gene} "
-                f"health={self.health_gene} bullet_speed={self.bullet_speed_gene} "
-                f"scale={self.sprite_scale_gene} color={self.color_tint_gene} "
-                f"fitness={self.fitness}>")
-
-class Player(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
-        self.image = pygame.image.load(PLAYER_SPRITE).convert_alpha()
-        self.rect = self.image.get_rect()
-        self.rect.centerx = SCREEN_WIDTH // 2
-        self.rect.bottom = SCREEN_HEIGHT - 10
-        self.speed = 7
-        self.health = 100
-        self.max_health = 100
-
-    def update(self, pressed_keys):
-        if pressed_keys[pygame.K_LEFT] and self.rect.left > 0:
-            self.rect.x -= self.speed
-        if pressed_keys[pygame.K_RIGHT] and self.rect.right < SCREEN_WIDTH:
-            self.rect.x += self.speed
-
-    def draw_health_bar(self, surface):
-        bar_length = 100
-        bar_height = 10
-        fill = (self.health / self.max_health) * bar_length
-        # Draw the bar above the player so it�s visible:
-        outline_rect = pygame.Rect(self.rect.centerx - bar_length // 2, self.rect.top - 20, bar_length, bar_height)
-        fill_rect = pygame.Rect(self.rect.centerx - bar_length // 2, self.rect.top - 20, fill, bar_height)
-        pygame.draw.rect(surface, RED, outline_rect)
-        pygame.draw.rect(surface, GREEN, fill_rect)
-
-class Enemy(pygame.sprite.Sprite):
-    def __init__(self, level, chromosome=None):
-        super().__init__()
-        sprite_index = random.randint(0, len(ENEMY_SPRITES) - 1)
-        self.image = pygame.image.load(ENEMY_SPRITES[sprite_index]).convert_alpha()
-
-        # Assign or create a chromosome
-        if chromosome is None:
-            self.chromosome = EnemyChromosome()
-        else:
-            self.chromosome = chromosome
-
-        # Scale the sprite according to sprite_scale_gene
-        scale_percent = self.chromosome.sprite_scale_gene
-        width = self.image.get_width() * scale_percent // 100
-        height = self.image.get_height() * scale_percent // 100
-        self.image = pygame.transform.scale(self.image, (width, height))
-
-        # Optionally tint the sprite with color_tint_gene
-        # This example adds a tinted overlay (primarily red).
-        tint_surf = pygame.Surface((width, height), flags=pygame.SRCALPHA)
-        # color_tint_gene -> interpret as some intensity in the red channel
-        tint_surf.fill((self.chromosome.color_tint_gene, 0, 0, 50))
-        self.image.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-
-        self.rect = self.image.get_rect()
-        self.rect.x = random.randint(50, SCREEN_WIDTH - 50 - self.rect.width)
-        self.rect.y = random.randint(-100, -40)
-
-        # Combine chromosome speed with the level
-        #self.speed = self.chromosome.speed_gene + level
-
-        # Instead of a single "speed", track x and y velocity separately:
-        # You can randomize them or base them on "level"
-        self.dx = random.choice([-1, 1]) * (random.randint(1, 2) + level)
-        self.dy = self.chromosome.speed_gene + level/4
-
-        # For health, we can start with base 20, multiplied by health_gene
-        self.health = 20 * self.chromosome.health_gene
-
-    def update(self):
-        # Move according to velocities
-        self.rect.x += self.dx
-        self.rect.y += self.dy
-
-        # Bounce horizontally
-        if self.rect.left < 0:
-            self.rect.left = 0
-            self.dx = -self.dx  # reverse direction
-        elif self.rect.right > SCREEN_WIDTH:
-            self.rect.right = SCREEN_WIDTH
-            self.dx = -self.dx
-
-        # Award some "travel fitness" for each update tick it stays alive
-        self.chromosome.add_fitness(self.dy)
-
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y):
-        super().__init__()
-        self.image = pygame.Surface((4, 10))
-        self.image.fill(WHITE)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.speed = 10
-
-    def update(self):
-        self.rect.y -= self.speed
-        if self.rect.bottom < 0:
-            self.kill()
+from functools import lru_cache
+from .settings import WHITE, GREEN, RED, PLAYER_SPRITE, ENEMY_SPRITES
+from .simulation import BULLET_WIDTH, BULLET_HEIGHT
+from .chromosome import EnemyChromosome
+
+# Images for the records in simulation.py. Only the renderer needs these,
+# the simulation itself never creates a pygame Surface.
+#
+# Images are cached process-wide: every PNG is decoded once and each
+# (sprite_index, sprite_scale_gene, color_tint_gene) variant is built once,
+# so spawning an enemy does no disk I/O or blitting. The returned surfaces
+# are shared, only blit them, never draw on them.
+
+# Scaled/tinted enemy variants kept around (least recently used are dropped)
+ENEMY_IMAGE_CACHE_SIZE = 256
+
+@lru_cache(maxsize=None)
+def load_player_image():
+    return pygame.image.load(PLAYER_SPRITE).convert_alpha()
+
+@lru_cache(maxsize=None)
+def _load_enemy_sprite(sprite_index):
+    return pygame.image.load(ENEMY_SPRITES[sprite_index]).convert_alpha()
+
+@lru_cache(maxsize=ENEMY_IMAGE_CACHE_SIZE)
+def enemy_surface(sprite_index, sprite_scale_gene, color_tint_gene):
+    image = _load_enemy_sprite(sprite_index)
+
+    # Scale the sprite according to sprite_scale_gene
+    width = image.get_width() * sprite_scale_gene // 100
+    height = image.get_height() * sprite_scale_gene // 100
+    image = pygame.transform.scale(image, (width, height))
+
+    # Optionally tint the sprite with color_tint_gene
+    # This example adds a tinted overlay (primarily red).
+    tint_surf = pygame.Surface((width, height), flags=pygame.SRCALPHA)
+    # color_tint_gene -> interpret as some intensity in the red channel
+    tint_surf.fill((color_tint_gene, 0, 0, 50))
+    image.blit(tint_surf, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+    return image
+
+def build_enemy_image(sprite_index, chromosome):
+    return enemy_surface(sprite_index, chromosome.sprite_scale_gene, chromosome.color_tint_gene)
+
+def clear_sprite_cache():
+    # Cached surfaces belong to the current display, drop them when it goes away
+    load_player_image.cache_clear()
+    _load_enemy_sprite.cache_clear()
+    enemy_surface.cache_clear()
+    make_bullet_image.cache_clear()
+
+@lru_cache(maxsize=None)
+def make_bullet_image():
+    # One bullet surface shared by every bullet (never draw on it)
+    image = pygame.Surface((BULLET_WIDTH, BULLET_HEIGHT))
+    image.fill(WHITE)
+    return image
+
+def draw_health_bar(surface, player):
+    bar_length = 100
+    bar_height = 10
+    fill = (player.health / player.max_health) * bar_length
+    # Draw the bar above the player so it�s visible:
+    outline_rect = pygame.Rect(player.centerx - bar_length // 2, player.top - 20, bar_length, bar_height)
+    fill_rect = pygame.Rect(player.centerx - bar_length // 2, player.top - 20, fill, bar_height)
+    pygame.draw.rect(surface, RED, outline_rect)
+    pygame.draw.rect(surface, GREEN, fill_rect)
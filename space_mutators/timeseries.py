@@ -0,0 +1,79 @@
+# timeseries.py
+
+import numpy as np
+
+class DownsampledSeries:
+    # Fixed-memory history of a value sampled every frame.
+    #
+    # Samples go into at most `capacity` buckets of `bucket_size` samples,
+    # each keeping min/max/sum/count. When every bucket is full, neighbouring
+    # buckets are merged pairwise and bucket_size doubles, so the whole
+    # session always fits in `capacity` points (one per chart pixel) and
+    # append is O(1) amortized. Overall min/max and the last value are kept
+    # on the side, no scans needed.
+
+    def __init__(self, capacity=300):
+        self.capacity = capacity - capacity % 2  # merging needs an even count
+        self.bucket_size = 1
+        self.mins = np.zeros(self.capacity)
+        self.maxs = np.zeros(self.capacity)
+        self.sums = np.zeros(self.capacity)
+        self.counts = np.zeros(self.capacity, dtype=np.int64)
+        self.num_buckets = 0
+
+        self.total = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.last = None
+        # Bumped on every change, lets cached drawings know they are stale
+        self.version = 0
+
+    def __len__(self):
+        return self.total
+
+    def append(self, value):
+        n = self.num_buckets
+        if n == 0 or self.counts[n - 1] == self.bucket_size:
+            if n == self.capacity:
+                self._merge()
+                n = self.num_buckets
+            self.mins[n] = value
+            self.maxs[n] = value
+            self.sums[n] = 0.0
+            self.counts[n] = 0
+            self.num_buckets = n = n + 1
+
+        i = n - 1
+        if value < self.mins[i]:
+            self.mins[i] = value
+        if value > self.maxs[i]:
+            self.maxs[i] = value
+        self.sums[i] += value
+        self.counts[i] += 1
+
+        self.total += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+        self.version += 1
+
+    def _merge(self):
+        # Halve the resolution: bucket i becomes buckets 2i and 2i + 1
+        half = self.capacity // 2
+        np.minimum(self.mins[0::2], self.mins[1::2], out=self.mins[:half])
+        np.maximum(self.maxs[0::2], self.maxs[1::2], out=self.maxs[:half])
+        self.sums[:half] = self.sums[0::2] + self.sums[1::2]
+        self.counts[:half] = self.counts[0::2] + self.counts[1::2]
+        self.num_buckets = half
+        self.bucket_size *= 2
+
+    def means(self):
+        n = self.num_buckets
+        return self.sums[:n] / self.counts[:n]
+
+    def ranges(self):
+        # Per-bucket (min, max) arrays
+        n = self.num_buckets
+        return self.mins[:n], self.maxs[:n]
@@ -0,0 +1,239 @@
+# train_apex.py
+
+import queue
+import random
+import time
+import numpy as np
+import torch
+import multiprocessing as mp
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from .space_mutators_env import SpaceMutatorsEnv, ACTIONS
+from .dqn_agent import DQNAgent, DQNNet
+from .actor_pool import shared_array, worker_seed
+from .train_dqn import save_results
+
+# Asynchronous actor/learner training (Ape-X style, one machine).
+#
+# Actor processes play their own SpaceMutatorsEnv with a fixed epsilon each
+# and send transitions to the learner in small batches over a queue. They
+# refresh their network from a shared-memory parameter snapshot every
+# `actor_sync_interval` steps.
+# This process is the learner: it moves incoming batches into its replay
+# buffer and trains continuously, publishing new weights every
+# `weight_sync_interval` updates.
+#
+# replay_ratio = sampled transitions per inserted transition. The learner
+# waits for actors when it gets ahead of that ratio, None means never wait.
+
+
+def actor_epsilons(num_actors, base=0.4, alpha=7.0):
+    # Ape-X spread: eps_i = base ** (1 + alpha * i / (N - 1))
+    if num_actors == 1:
+        return [base]
+    return [base ** (1 + alpha * i / (num_actors - 1)) for i in range(num_actors)]
+
+
+def _actor(index, epsilon, state_dim, action_dim, param_name, num_params, stats_name, num_actors,
+           weights_lock, transitions, stop, actor_sync_interval, send_size, seed):
+    # Own streams for the env and for exploration, nothing global is reseeded
+    actor_seed = worker_seed(seed, index)
+    rng = random.Random(actor_seed)
+    torch.set_num_threads(1)
+
+    param_shm, params = shared_array((num_params,), np.float32, name=param_name)
+    # stats[0] = weights version, stats[1 + i] = steps of actor i
+    stats_shm, stats = shared_array((1 + num_actors,), np.int64, name=stats_name)
+
+    env = SpaceMutatorsEnv(render=False, seed=actor_seed)
+    net = DQNNet(state_dim, action_dim)
+    net.eval()
+    version = -1
+
+    states = np.zeros((send_size, state_dim), dtype=np.float32)
+    actions = np.zeros(send_size, dtype=np.int64)
+    rewards = np.zeros(send_size, dtype=np.float32)
+    next_states = np.zeros((send_size, state_dim), dtype=np.float32)
+    dones = np.zeros(send_size, dtype=bool)
+    finished_returns = []
+    count = 0
+
+    state = env.reset()
+    episode_reward = 0.0
+    steps = 0
+    try:
+        while not stop.is_set():
+            # Refresh weights from the learner's snapshot
+            if steps % actor_sync_interval == 0 and stats[0] != version:
+                with weights_lock:
+                    flat = torch.from_numpy(params.copy())
+                    version = int(stats[0])
+                vector_to_parameters(flat, net.parameters())
+
+            # Epsilon-greedy
+            if rng.random() < epsilon:
+                action = rng.randint(0, action_dim - 1)
+            else:
+                with torch.inference_mode():
+                    action = net(torch.from_numpy(state).unsqueeze(0)).argmax(dim=1).item()
+
+            next_state, reward, done, _ = env.step(action)
+            episode_reward += reward
+            states[count] = state
+            actions[count] = action
+            rewards[count] = reward
+            next_states[count] = next_state
+            dones[count] = done
+            count += 1
+            steps += 1
+            stats[1 + index] = steps
+
+            if done:
+                finished_returns.append(episode_reward)
+                episode_reward = 0.0
+                state = env.reset()
+            else:
+                state = next_state
+
+            if count == send_size:
+                batch = (states.copy(), actions.copy(), rewards.copy(), next_states.copy(),
+                         dones.copy(), finished_returns)
+                # Block while the learner is behind, but keep an eye on stop
+                while not stop.is_set():
+                    try:
+                        transitions.put(batch, timeout=0.5)
+                        break
+                    except queue.Full:
+                        pass
+                finished_returns = []
+                count = 0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Don't hang on exit flushing batches nobody reads anymore
+        transitions.cancel_join_thread()
+        env.close()
+        del params, stats
+        param_shm.close()
+        stats_shm.close()
+
+
+def train_apex(num_actors=4, max_updates=100_000, max_seconds=None, replay_ratio=8.0,
+               weight_sync_interval=100, actor_sync_interval=400, send_size=64,
+               buffer_size=100_000, batch_size=64, min_replay=1000, target_update_freq=1000,
+               prioritized=False, log_interval=5.0, seed=None):
+    state_dim = SpaceMutatorsEnv(render=False).reset().shape[0]
+    action_dim = len(ACTIONS)
+
+    agent = DQNAgent(state_dim, action_dim, buffer_size=buffer_size, batch_size=batch_size,
+                     prioritized=prioritized, seed=seed)
+
+    # Shared parameter snapshot + version/step counters
+    num_params = sum(p.numel() for p in agent.online_net.parameters())
+    param_shm, params = shared_array((num_params,), np.float32)
+    stats_shm, stats = shared_array((1 + num_actors,), np.int64)
+    stats[:] = 0
+    weights_lock = mp.Lock()
+
+    def publish_weights():
+        flat = parameters_to_vector(agent.online_net.parameters()).detach().numpy()
+        with weights_lock:
+            params[:] = flat
+            stats[0] += 1
+
+    publish_weights()
+
+    transitions = mp.Queue(maxsize=4 * num_actors)
+    stop = mp.Event()
+    procs = []
+    for index, epsilon in enumerate(actor_epsilons(num_actors)):
+        proc = mp.Process(target=_actor,
+                          args=(index, epsilon, state_dim, action_dim, param_shm.name, num_params,
+                                stats_shm.name, num_actors, weights_lock, transitions, stop,
+                                actor_sync_interval, send_size, seed),
+                          daemon=True)
+        proc.start()
+        procs.append(proc)
+
+    scores_history = []
+    inserted = 0
+    updates = 0
+    start = time.perf_counter()
+    last_log = start
+    last_actor_steps = 0
+    last_updates = 0
+
+    def receive(block):
+        nonlocal inserted
+        try:
+            batch = transitions.get(timeout=0.5) if block else transitions.get_nowait()
+        except queue.Empty:
+            return False
+        states, actions, rewards, next_states, dones, finished_returns = batch
+        agent.replay_buffer.push_many(states, actions, rewards, next_states, dones)
+        inserted += len(states)
+        scores_history.extend(finished_returns)
+        return True
+
+    try:
+        while updates < max_updates:
+            if max_seconds is not None and time.perf_counter() - start > max_seconds:
+                break
+
+            # Take in whatever the actors produced so far
+            while receive(block=False):
+                pass
+
+            if len(agent.replay_buffer) < max(min_replay, batch_size):
+                receive(block=True)
+                continue
+            if replay_ratio is not None and updates * batch_size >= replay_ratio * inserted:
+                # Ahead of the replay ratio, wait for fresh experience
+                receive(block=True)
+                continue
+
+            agent.train_step()
+            updates += 1
+            if updates % target_update_freq == 0:
+                agent.update_target_net()
+            if updates % weight_sync_interval == 0:
+                publish_weights()
+
+            now = time.perf_counter()
+            if now - last_log >= log_interval:
+                actor_steps = int(stats[1:].sum())
+                elapsed = now - last_log
+                recent = scores_history[-10:]
+                avg_reward = sum(recent) / len(recent) if recent else 0.0
+                print(f"actor steps/sec={(actor_steps - last_actor_steps) / elapsed:.0f}, "
+                      f"learner updates/sec={(updates - last_updates) / elapsed:.0f}, "
+                      f"updates={updates}, replay={len(agent.replay_buffer)}, "
+                      f"episodes={len(scores_history)}, avg reward(10)={avg_reward:.2f}")
+                last_log, last_actor_steps, last_updates = now, actor_steps, updates
+    finally:
+        stop.set()
+        # Drain so no actor stays blocked on a full queue
+        deadline = time.perf_counter() + 10
+        while any(proc.is_alive() for proc in procs) and time.perf_counter() < deadline:
+            while receive(block=False):
+                pass
+            time.sleep(0.05)
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join()
+
+        total_time = time.perf_counter() - start
+        total_actor_steps = int(stats[1:].sum())
+        print(f"Finished: {total_actor_steps} actor steps ({total_actor_steps / total_time:.0f}/sec), "
+              f"{updates} learner updates ({updates / total_time:.0f}/sec)")
+
+        del params, stats
+        param_shm.close()
+        param_shm.unlink()
+        stats_shm.close()
+        stats_shm.unlink()
+
+    save_results(agent, scores_history)
+
+if __name__ == "__main__":
+    train_apex(num_actors=4, max_updates=100_000)
@@ -5,20 +5,59 @@ import torch
 import time
 from .space_mutators_env import SpaceMutatorsEnv, ACTIONS
 from .dqn_agent import DQNAgent
+from .replay_buffer import MemmapReplayBuffer
+from .actor_pool import EnvPool
+from .heatmap import EnemyHeatmap
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
-def train_dqn(num_episodes=1000, max_steps=1000, render=False):
-    env = SpaceMutatorsEnv(render=render)
-    state_dim = env.reset().shape[0]  # e.g. 7 from our example
+def train_dqn(num_episodes=1000, max_steps=1000, render=False, prioritized=False, fast_path=True,
+              num_workers=0, seed=None, replay_dir=None, buffer_size=10000, heatmap_path=None,
+              action_repeat=1, obs_mode="vector"):
+    # num_workers > 0 steps that many envs in worker processes (see actor_pool.py)
+    # obs_mode="pixels" trains the CNN on stacked grayscale frames (single env only)
+    # obs_mode="entities" adds the nearest enemies/bullets to the vector (single env only)
+    # action_repeat=k makes every decision (and stored transition) cover k game ticks
+    # heatmap_path saves the enemy occupancy of the whole run as an .npy file
+    if num_workers > 0:
+        if heatmap_path is not None:
+            raise ValueError("heatmap_path needs the single-env loop (num_workers=0)")
+        if obs_mode != "vector":
+            raise ValueError("Worker envs share vector observations only, use num_workers=0")
+        return train_dqn_parallel(num_episodes, max_steps, num_workers, prioritized=prioritized,
+                                  fast_path=fast_path, seed=seed, replay_dir=replay_dir,
+                                  buffer_size=buffer_size, action_repeat=action_repeat)
+
+    # Full game resolution, one count per enemy center per simulation tick;
+    # only the occupancy counts are kept, nothing is drawn
+    heatmap = None
+    if heatmap_path is not None:
+        heatmap = EnemyHeatmap(SCREEN_WIDTH, SCREEN_HEIGHT, display=False)
+
+    # seed fixes the games, the exploration and the network initialisation
+    env = SpaceMutatorsEnv(render=render, action_repeat=action_repeat, obs_mode=obs_mode, seed=seed,
+                           heatmap=heatmap)
+    state = env.reset()
+    # e.g. 7 from our example, or the (frames, height, width) shape in pixel mode
+    state_dim = state.shape[0] if state.ndim == 1 else state.shape
     action_dim = len(ACTIONS)        # 4
 
-    agent = DQNAgent(state_dim, action_dim)
+    # prioritized=True switches to prioritized experience replay,
+    # fast_path=False falls back to building new tensors every step (for comparison),
+    # replay_dir keeps the replay buffer on disk so a later run can resume it
+    # (pixel frames are stored once each unless PER or an on-disk buffer is asked for)
+    frame_replay = obs_mode == "pixels" and not prioritized and replay_dir is None
+    agent = DQNAgent(state_dim, action_dim, prioritized=prioritized, fast_path=fast_path,
+                     buffer_size=buffer_size, replay_dir=replay_dir, frame_replay=frame_replay,
+                     seed=seed)
 
     target_update_freq = 1000  # steps
     total_steps = 0
+    scores_history = []
 
     for episode in range(num_episodes):
         state = env.reset()
         episode_reward = 0
+        episode_start = time.perf_counter()
         for step_i in range(max_steps):
             action = agent.select_action(state)
             next_state, reward, done, _ = env.step(action)
@@ -37,9 +76,83 @@ def train_dqn(num_episodes=1000, max_steps=1000, render=False):
             if done:
                 break
 
-        print(f"Episode {episode} finished, reward={episode_reward:.2f}, epsilon={agent.epsilon:.3f}")
+        scores_history.append(episode_reward)
+        steps_per_sec = (step_i + 1) / (time.perf_counter() - episode_start)
+        print(f"Episode {episode} finished, reward={episode_reward:.2f}, epsilon={agent.epsilon:.3f}, "
+              f"steps/sec={steps_per_sec:.0f}")
     
     env.close()
+    if heatmap is not None:
+        heatmap.save(heatmap_path)
+        print(f"Saved enemy occupancy heatmap to {heatmap_path}")
+    save_results(agent, scores_history)
+
+def train_dqn_parallel(num_episodes=1000, max_steps=1000, num_workers=4, prioritized=False,
+                       fast_path=True, seed=None, replay_dir=None, buffer_size=10000,
+                       action_repeat=1):
+    # Workers step their own SpaceMutatorsEnv and publish observations through
+    # shared memory; this process picks actions for all of them in one batch,
+    # stores the K transitions and does one gradient step per batch.
+    pool = EnvPool(num_workers=num_workers, seed=seed, action_repeat=action_repeat)
+    state_dim = pool.observation_dim
+    action_dim = len(ACTIONS)
+
+    agent = DQNAgent(state_dim, action_dim, prioritized=prioritized, fast_path=fast_path,
+                     buffer_size=buffer_size, replay_dir=replay_dir, seed=seed)
+
+    target_update_freq = 1000  # steps
+    total_steps = 0
+    scores_history = []
+
+    episode_rewards = np.zeros(num_workers)
+    episode_steps = np.zeros(num_workers, dtype=np.int64)
+    start = time.perf_counter()
+
+    try:
+        states = pool.reset().copy()
+        while len(scores_history) < num_episodes:
+            actions = agent.select_actions(states)
+            next_obs, rewards, dones, infos = pool.step(actions)
+
+            # The transition of a finished game ends in its terminal observation
+            next_states = next_obs.copy()
+            if dones.any():
+                next_states[dones] = infos["terminal_observation"][dones]
+            agent.replay_buffer.push_many(states, actions, rewards, next_states, dones)
+            agent.train_step()
+
+            episode_rewards += rewards
+            episode_steps += 1
+            agent.update_epsilon(steps=num_workers)
+            previous_steps = total_steps
+            total_steps += num_workers
+            if total_steps // target_update_freq > previous_steps // target_update_freq:
+                agent.update_target_net()
+
+            # Games that hit max_steps are restarted like the single-env loop does
+            truncated = (episode_steps >= max_steps) & ~dones
+            if truncated.any():
+                next_obs = pool.reset_envs(truncated)
+            states = next_obs.copy()
+
+            for i in np.flatnonzero(dones | truncated):
+                scores_history.append(float(episode_rewards[i]))
+                steps_per_sec = total_steps / (time.perf_counter() - start)
+                print(f"Episode {len(scores_history) - 1} finished (worker {i}), "
+                      f"reward={episode_rewards[i]:.2f}, epsilon={agent.epsilon:.3f}, "
+                      f"steps/sec={steps_per_sec:.0f}")
+                episode_rewards[i] = 0.0
+                episode_steps[i] = 0
+    finally:
+        pool.close()
+
+    save_results(agent, scores_history)
+
+def save_results(agent, scores_history):
+    # Make sure an on-disk replay store is complete for the next run
+    if isinstance(agent.replay_buffer, MemmapReplayBuffer):
+        agent.replay_buffer.flush()
+
     # Optionally save the network
     torch.save(agent.online_net.state_dict(), "dqn_model.pth")
 
@@ -1,7 +1,51 @@
 import pygame
+from collections import OrderedDict
+
+# Rendered text kept around (least recently used are dropped)
+TEXT_CACHE_SIZE = 256
+
+class TextCache:
+    # LRU cache of font.render results keyed by (font, text, color, antialias).
+    # Returned surfaces are shared, only blit them, never draw on them.
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        # Returns (surface, rect); the rect is a fresh copy the caller may move
+        key = (font, text, tuple(color), antialias)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            surface = font.render(text, antialias, color)
+            entry = (surface, surface.get_rect())
+            self.entries[key] = entry
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        surface, rect = entry
+        return surface, rect.copy()
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+# Shared by draw_text and the HUD
+text_cache = TextCache()
 
 def draw_text(text, font, color, surface, x, y):
-    text_obj = font.render(text, True, color)
-    text_rect = text_obj.get_rect()
+    text_obj, text_rect = text_cache.render(font, text, color)
     text_rect.center = (x, y)
     surface.blit(text_obj, text_rect)
@@ -0,0 +1,340 @@
+# vec_env.py
+
+import numpy as np
+from .settings import SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_SPRITES
+from .simulation import (
+    PLAYER_SIZE, ENEMY_SIZES, PLAYER_SPEED, PLAYER_MAX_HEALTH,
+    BULLET_WIDTH, BULLET_HEIGHT, BULLET_SPEED
+)
+from .space_mutators_env import ACTIONS
+
+# SpaceMutatorsVecEnv steps N independent games at once.
+# Instead of one pygame sprite per entity, every game's state lives in
+# struct-of-arrays NumPy buffers:
+#   player  -> (N,)   arrays
+#   enemies -> (N, max_enemies) arrays, kept in spawn order per game
+#   bullets -> (N, max_bullets) arrays
+# The rules follow SpaceMutatorsEnv._handle_action/_update/_calculate_reward,
+# including pygame.Rect's integer positions.
+#
+# Unlike SpaceMutatorsEnv, a game holds at most max_enemies enemies and
+# max_bullets bullets. A spawn or shot that finds its game full is dropped:
+# the step's infos then carry per-game "dropped_spawns"/"dropped_shots"
+# counts, and dropped_spawns/dropped_shots keep the totals of the run.
+# max_bullets is sized so one shot per step never fills it, so in practice
+# only spawns can be dropped (when max_enemies is too small for the level).
+
+OBS_DIM = 7
+
+
+def _rect_round(values):
+    # pygame.Rect stores ints and rounds half away from zero when given floats
+    return np.trunc(values + np.copysign(0.5, values))
+
+
+class SpaceMutatorsVecEnv:
+    def __init__(self, num_envs=8, max_enemies=16, seed=None):
+        self.num_envs = num_envs
+        self.max_enemies = max_enemies
+        self.observation_dim = OBS_DIM
+        self.action_dim = len(ACTIONS)
+        self.rng = np.random.default_rng(seed)
+
+        # Same settings as SpaceMutatorsEnv
+        self.spawn_interval = 80
+        self.max_levels = 10
+        self.max_escaped = 10
+
+        # Sprite sizes only, the images themselves are never loaded
+        self.player_w, self.player_h = PLAYER_SIZE
+        self.player_top = SCREEN_HEIGHT - 10 - self.player_h
+        self.enemy_base_sizes = np.array(ENEMY_SIZES, dtype=np.int32)
+
+        # A bullet lives until its bottom leaves the screen, one can be fired per step
+        self.max_bullets = (self.player_top + BULLET_HEIGHT) // BULLET_SPEED + 3
+
+        n, e, b = num_envs, max_enemies, self.max_bullets
+
+        # Player / game state
+        self.player_x = np.zeros(n, dtype=np.int32)
+        self.player_health = np.zeros(n, dtype=np.int32)
+        self.prev_player_x = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.escaped_enemies = np.zeros(n, dtype=np.int32)
+        self.level = np.ones(n, dtype=np.int32)
+        self.spawn_timer = np.zeros(n, dtype=np.int32)
+        self.dones = np.zeros(n, dtype=bool)
+
+        # Enemies: rects, velocities and chromosome genes
+        self.enemy_alive = np.zeros((n, e), dtype=bool)
+        self.enemy_x = np.zeros((n, e), dtype=np.int32)
+        self.enemy_y = np.zeros((n, e), dtype=np.int32)
+        self.enemy_w = np.zeros((n, e), dtype=np.int32)
+        self.enemy_h = np.zeros((n, e), dtype=np.int32)
+        self.enemy_dx = np.zeros((n, e), dtype=np.int32)
+        self.enemy_dy = np.zeros((n, e), dtype=np.float64)
+        self.enemy_health = np.zeros((n, e), dtype=np.int32)
+        self.enemy_fitness = np.zeros((n, e), dtype=np.float64)
+        self.speed_gene = np.zeros((n, e), dtype=np.int32)
+        self.health_gene = np.zeros((n, e), dtype=np.int32)
+        self.bullet_speed_gene = np.zeros((n, e), dtype=np.int32)
+        self.sprite_scale_gene = np.zeros((n, e), dtype=np.int32)
+        self.color_tint_gene = np.zeros((n, e), dtype=np.int32)
+        self._enemy_columns = [
+            self.enemy_alive, self.enemy_x, self.enemy_y, self.enemy_w, self.enemy_h,
+            self.enemy_dx, self.enemy_dy, self.enemy_health, self.enemy_fitness,
+            self.speed_gene, self.health_gene, self.bullet_speed_gene,
+            self.sprite_scale_gene, self.color_tint_gene,
+        ]
+
+        # Bullets (all share the same 4x10 rect)
+        self.bullet_alive = np.zeros((n, b), dtype=bool)
+        self.bullet_x = np.zeros((n, b), dtype=np.int32)
+        self.bullet_y = np.zeros((n, b), dtype=np.int32)
+
+        self._obs = np.zeros((n, OBS_DIM), dtype=np.float32)
+
+        # Spawns/shots dropped because a game's arrays were full (see above)
+        self.dropped_spawns = np.zeros(n, dtype=np.int64)
+        self.dropped_shots = np.zeros(n, dtype=np.int64)
+        self._step_dropped_spawns = np.zeros(n, dtype=np.int64)
+        self._step_dropped_shots = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self):
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._get_observation()
+
+    def _reset_envs(self, mask):
+        self.player_x[mask] = SCREEN_WIDTH // 2 - self.player_w // 2
+        self.player_health[mask] = PLAYER_MAX_HEALTH
+        self.prev_player_x[mask] = SCREEN_WIDTH // 2
+        self.score[mask] = 0
+        self.escaped_enemies[mask] = 0
+        self.level[mask] = 1
+        self.spawn_timer[mask] = 0
+        self.dones[mask] = False
+        self.enemy_alive[mask] = False
+        self.bullet_alive[mask] = False
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        self._step_dropped_spawns.fill(0)
+        self._step_dropped_shots.fill(0)
+
+        # 1) Process actions
+        self._handle_actions(actions)
+
+        # 2) Spawn enemies periodically
+        self.spawn_timer += 1
+        spawning = self.spawn_timer >= self.spawn_interval
+        if spawning.any():
+            self.spawn_timer[spawning] = 0
+            self._spawn_enemies(np.flatnonzero(spawning))
+
+        # 3) Update logic
+        self._update()
+
+        # 4) Calculate reward
+        rewards = self._calculate_reward()
+
+        # 5) Observations, with finished games reset in place
+        obs = self._get_observation()
+        dones = self.dones.copy()
+        infos = {}
+        if self._step_dropped_spawns.any():
+            infos["dropped_spawns"] = self._step_dropped_spawns.copy()
+        if self._step_dropped_shots.any():
+            infos["dropped_shots"] = self._step_dropped_shots.copy()
+        if dones.any():
+            infos["terminal_observation"] = obs.copy()
+            self._reset_envs(dones)
+            obs = self._get_observation()
+        return obs, rewards, dones, infos
+
+    def _handle_actions(self, actions):
+        self.player_x -= np.where(actions == 1, PLAYER_SPEED, 0).astype(np.int32)
+        self.player_x += np.where(actions == 2, PLAYER_SPEED, 0).astype(np.int32)
+
+        shooting = np.flatnonzero(actions == 3)
+        if len(shooting):
+            # First free bullet slot in every shooting game
+            free = ~self.bullet_alive[shooting]
+            slot = free.argmax(axis=1)
+            has_slot = free[np.arange(len(shooting)), slot]
+            if not has_slot.all():
+                self._count_drops(shooting[~has_slot], self._step_dropped_shots, self.dropped_shots)
+            envs, slot = shooting[has_slot], slot[has_slot]
+            centerx = self.player_x[envs] + self.player_w // 2
+            self.bullet_alive[envs, slot] = True
+            self.bullet_x[envs, slot] = centerx - BULLET_WIDTH // 2
+            self.bullet_y[envs, slot] = self.player_top - BULLET_HEIGHT // 2
+
+        # Bound the player inside the screen
+        np.clip(self.player_x, 0, SCREEN_WIDTH - self.player_w, out=self.player_x)
+
+    def _count_drops(self, envs, step_counts, totals):
+        # envs holds every game at most once per call
+        step_counts[envs] += 1
+        totals[envs] += 1
+
+    def _spawn_enemies(self, envs):
+        # Enemies are appended after the live ones so slot order == spawn order
+        count = self.enemy_alive[envs].sum(axis=1)
+        has_room = count < self.max_enemies
+        if not has_room.all():
+            self._count_drops(envs[~has_room], self._step_dropped_spawns, self.dropped_spawns)
+        envs, slot = envs[has_room], count[has_room]
+        k = len(envs)
+        if k == 0:
+            return
+
+        rng = self.rng
+        level = self.level[envs]
+
+        # Random EnemyChromosome()
+        speed = rng.integers(1, 3, size=k)
+        health = rng.integers(1, 4, size=k)
+        bullet_speed = rng.integers(5, 13, size=k)
+        scale = rng.integers(80, 151, size=k)
+        tint = rng.integers(0, 256, size=k)
+
+        sprite_index = rng.integers(0, len(ENEMY_SPRITES), size=k)
+        base = self.enemy_base_sizes[sprite_index]
+        width = base[:, 0] * scale // 100
+        height = base[:, 1] * scale // 100
+
+        x = rng.integers(50, SCREEN_WIDTH - 50 - width + 1)
+        y = rng.integers(-100, -39, size=k)
+        dx = rng.choice([-1, 1], size=k) * (rng.integers(1, 3, size=k) + level)
+        dy = speed + level / 4
+
+        self.enemy_alive[envs, slot] = True
+        self.enemy_x[envs, slot] = x
+        self.enemy_y[envs, slot] = y
+        self.enemy_w[envs, slot] = width
+        self.enemy_h[envs, slot] = height
+        self.enemy_dx[envs, slot] = dx
+        self.enemy_dy[envs, slot] = dy
+        self.enemy_health[envs, slot] = 20 * health
+        self.enemy_fitness[envs, slot] = 0.0
+        self.speed_gene[envs, slot] = speed
+        self.health_gene[envs, slot] = health
+        self.bullet_speed_gene[envs, slot] = bullet_speed
+        self.sprite_scale_gene[envs, slot] = scale
+        self.color_tint_gene[envs, slot] = tint
+
+    def _update(self):
+        alive = self.enemy_alive
+
+        # Update enemies (move, bounce horizontally, travel fitness)
+        self.enemy_x += np.where(alive, self.enemy_dx, 0)
+        self.enemy_y[:] = np.where(alive, _rect_round(self.enemy_y + self.enemy_dy), self.enemy_y)
+        right_edge = SCREEN_WIDTH - self.enemy_w
+        bounced = alive & ((self.enemy_x < 0) | (self.enemy_x > right_edge))
+        np.clip(self.enemy_x, 0, right_edge, out=self.enemy_x)
+        self.enemy_dx[bounced] *= -1
+        self.enemy_fitness += np.where(alive, self.enemy_dy, 0.0)
+
+        # Update bullets
+        self.bullet_y -= BULLET_SPEED
+        self.bullet_alive &= self.bullet_y + BULLET_HEIGHT >= 0
+
+        # Enemies that went off-screen at the bottom
+        escaped = alive & (self.enemy_y > SCREEN_HEIGHT)
+        alive &= ~escaped
+        self.escaped_enemies += escaped.sum(axis=1, dtype=np.int32)
+        self.dones |= self.escaped_enemies >= self.max_escaped
+
+        # Bullet-enemy collisions
+        hit = self._bullet_collisions()
+        alive &= ~hit
+        self.score += hit.sum(axis=1, dtype=np.int32)
+
+        # Enemy-player collisions
+        touching = alive & (
+            (self.enemy_x < self.player_x[:, None] + self.player_w)
+            & (self.enemy_x + self.enemy_w > self.player_x[:, None])
+            & (self.enemy_y < self.player_top + self.player_h)
+            & (self.enemy_y + self.enemy_h > self.player_top)
+        )
+        alive &= ~touching
+        self.player_health -= 20 * touching.sum(axis=1, dtype=np.int32)
+        self.dones |= self.player_health <= 0
+
+        # Check leveling
+        level_up = (self.score >= 20 * self.level) & (self.level < self.max_levels)
+        self.level += level_up
+
+        self._compact_enemies(escaped | hit | touching)
+
+    def _bullet_collisions(self):
+        # overlap[env, enemy, bullet]
+        ex, ey = self.enemy_x[:, :, None], self.enemy_y[:, :, None]
+        bx, by = self.bullet_x[:, None, :], self.bullet_y[:, None, :]
+        overlap = (
+            self.enemy_alive[:, :, None] & self.bullet_alive[:, None, :]
+            & (ex < bx + BULLET_WIDTH) & (ex + self.enemy_w[:, :, None] > bx)
+            & (ey < by + BULLET_HEIGHT) & (ey + self.enemy_h[:, :, None] > by)
+        )
+        if not overlap.any():
+            return np.zeros_like(self.enemy_alive)
+
+        if (overlap.sum(axis=1) <= 1).all():
+            # No bullet touches two enemies, so every pair can be resolved at once
+            hit = overlap.any(axis=2)
+            self.bullet_alive &= ~overlap.any(axis=1)
+            return hit
+
+        # groupcollide walks enemies in spawn order and a bullet only kills the first one
+        hit = np.zeros_like(self.enemy_alive)
+        for slot in range(self.max_enemies):
+            slot_hits = overlap[:, slot, :] & self.bullet_alive
+            hit[:, slot] = slot_hits.any(axis=1)
+            self.bullet_alive &= ~slot_hits
+        return hit
+
+    def _compact_enemies(self, removed):
+        if not removed.any():
+            return
+        # Stable sort keeps survivors in spawn order at the front of each row
+        order = np.argsort(~self.enemy_alive, axis=1, kind="stable")
+        for column in self._enemy_columns:
+            column[:] = np.take_along_axis(column, order, axis=1)
+
+    def _calculate_reward(self):
+        current_x = self.player_x + self.player_w // 2
+        movement = np.abs(current_x - self.prev_player_x)
+
+        rewards = 10.0 * self.score - 2.0 * self.escaped_enemies
+
+        # Prevent standing still / reward moving
+        rewards -= np.where(movement < 2, 4.0, 0.0)
+        rewards += np.where(movement > 2, 0.2, 0.0)
+
+        self.prev_player_x[:] = current_x
+        return rewards.astype(np.float32)
+
+    def _get_observation(self):
+        alive = self.enemy_alive
+        num_enemies = alive.sum(axis=1)
+        centery = self.enemy_y + self.enemy_h // 2
+        sum_y = np.where(alive, centery, 0).sum(axis=1)
+        avg_enemy_y = np.divide(
+            sum_y, num_enemies * SCREEN_HEIGHT,
+            out=np.zeros(self.num_envs), where=num_enemies > 0
+        )
+
+        obs = self._obs
+        obs[:, 0] = (self.player_x + self.player_w // 2) / float(SCREEN_WIDTH)
+        obs[:, 1] = self.player_health / 100.0
+        obs[:, 2] = num_enemies
+        obs[:, 3] = avg_enemy_y
+        obs[:, 4] = self.bullet_alive.sum(axis=1)
+        obs[:, 5] = self.score
+        obs[:, 6] = self.escaped_enemies
+        return obs.copy()
+
+    def close(self):
+        pass